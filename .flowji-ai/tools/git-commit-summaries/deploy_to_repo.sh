@@ -27,11 +27,11 @@ echo "Source: $TOOLKIT_ROOT/.flowji-ai"
 echo "Target: $TARGET_REPO/.flowji-ai"
 echo ""
 
-# Use rsync to copy .flowji-ai directory, excluding memory/
-rsync -av --exclude='memory/' "$TOOLKIT_ROOT/.flowji-ai/" "$TARGET_REPO/.flowji-ai/"
+# Use rsync to copy .flowji-ai directory, excluding memory/ and the target's own config.json
+rsync -av --exclude='memory/' --exclude='/config.json' "$TOOLKIT_ROOT/.flowji-ai/" "$TARGET_REPO/.flowji-ai/"
 
 echo ""
-echo "✓ Toolkit files copied (memory/ excluded)"
+echo "✓ Toolkit files copied (memory/ and config.json excluded)"
 echo ""
 
 # Check if target is a git repository
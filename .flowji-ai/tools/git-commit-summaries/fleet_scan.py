@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Fleet health scanner for git-commit-summaries deployments.
+
+Reads the deployment registry and checks every registered repository in
+parallel: installed hooks and their stamped versions, `.flowji-ai/VERSION`
+and tool VERSION drift against this toolkit, summary count, age of the newest
+summary, and post-commit hook latency recorded by the hook itself. All checks
+are plain filesystem reads (no git subprocesses), so hundreds of repositories
+scan in seconds.
+
+Registry formats (first one found wins, or pass --registry):
+    deployment-registry.json  {"deployments": [{"name": "...", "path": "~/repo"}]}
+    deployment-registry.md    Markdown table with the repository path in column 2
+
+Usage:
+    python3 fleet_scan.py                 # Table report
+    python3 fleet_scan.py --json          # Machine-readable report
+    python3 fleet_scan.py --stale-days 7  # Flag repos without summaries for 7 days
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from summary_config import CONFIG_RELATIVE_PATH, find_common_dir, find_git_dir, read_config_file
+
+
+DEFAULT_SUMMARY_SUBDIR = ".flowji-ai/memory/git-summaries"
+HOOK_NAMES = ("post-commit", "prepare-commit-msg", "pre-push", "post-merge", "post-checkout")
+REQUIRED_HOOKS = ("post-commit", "prepare-commit-msg")
+HOOK_VERSION_PATTERN = re.compile(r"^# flowji-ai git-commit-summaries hook version: (\S+)$", re.MULTILINE)
+SUMMARY_NAME_PATTERN = re.compile(r"^(\d{4}-\d{2}-\d{2}--\d{6})Z(_\d+)?\.md$")
+DEFAULT_STALE_DAYS = 30
+DEFAULT_WORKERS = 32
+
+
+def get_toolkit_root() -> Path:
+    """Return the repository containing this toolkit (three levels up)."""
+    return Path(__file__).resolve().parents[3]
+
+
+def read_text(path: Path) -> Optional[str]:
+    """Return stripped file contents, or None if unreadable."""
+    try:
+        return path.read_text(encoding="utf-8").strip()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def load_registry(registry: Optional[Path]) -> List[Dict[str, str]]:
+    """Load deployments from a JSON registry or the legacy Markdown table."""
+    candidates = [registry] if registry else [
+        get_toolkit_root() / "deployment-registry.json",
+        get_toolkit_root() / "deployment-registry.md",
+    ]
+    for path in candidates:
+        if path is None or not path.exists():
+            continue
+        if path.suffix == ".json":
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            entries = data.get("deployments", data) if isinstance(data, dict) else data
+            return [
+                {"name": entry.get("name") or Path(entry["path"]).name, "path": entry["path"]}
+                for entry in entries
+                if entry.get("path")
+            ]
+        return parse_markdown_registry(path)
+    return []
+
+
+def parse_markdown_registry(path: Path) -> List[Dict[str, str]]:
+    """Parse the Markdown registry table the shell scripts use."""
+    deployments = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if not line.startswith("|") or "|---" in line or "Repository Path" in line:
+            continue
+        cells = [cell.strip() for cell in line.strip().strip("|").split("|")]
+        if len(cells) < 2:
+            continue
+        repo_path = cells[1].strip("`")
+        if not repo_path or "git-commit-summaries`" in line:
+            continue
+        deployments.append({"name": cells[0].strip("`*") or Path(repo_path).name, "path": repo_path})
+    return deployments
+
+
+def read_core_hooks_path(config_path: Path) -> Optional[str]:
+    """Return core.hooksPath from a git config file (tab-indented INI)."""
+    content = read_text(config_path)
+    if not content:
+        return None
+    section = None
+    hooks_path = None
+    for raw_line in content.splitlines():
+        line = raw_line.strip()
+        if not line or line[0] in "#;":
+            continue
+        if line.startswith("["):
+            section = line.strip("[]").strip().lower()
+            continue
+        key, sep, value = line.partition("=")
+        if sep and section == "core" and key.strip().lower() == "hookspath":
+            hooks_path = value.strip()
+    return hooks_path
+
+
+def resolve_hooks_dir(repo: Path, common_dir: Path) -> Path:
+    """Return the hooks directory, honouring core.hooksPath."""
+    hooks_path = read_core_hooks_path(common_dir / "config")
+    if hooks_path:
+        hooks_path = os.path.expanduser(hooks_path.strip().strip('"'))
+        path = Path(hooks_path)
+        return path if path.is_absolute() else repo / path
+    return common_dir / "hooks"
+
+
+def check_hooks(hooks_dir: Path) -> Dict[str, dict]:
+    """Report presence, ownership and stamped version for each hook."""
+    hooks = {}
+    for name in HOOK_NAMES:
+        path = hooks_dir / name
+        content = read_text(path)
+        if content is None:
+            hooks[name] = {"installed": False, "version": None}
+            continue
+        match = HOOK_VERSION_PATTERN.search(content)
+        hooks[name] = {
+            "installed": "git-commit-summaries" in content or "post_commit_summary.py" in content,
+            "executable": os.access(path, os.X_OK),
+            "version": match.group(1) if match else "unknown",
+        }
+    return hooks
+
+
+def scan_summaries(summary_dir: Path) -> Dict[str, object]:
+    """Count summaries and find the most recently written one.
+
+    Age comes from file mtimes: filenames carry the author's local time with a
+    literal ``Z``, so they are not comparable to UTC.
+    """
+    count = 0
+    newest = None
+    newest_mtime = None
+    try:
+        with os.scandir(summary_dir) as entries:
+            for entry in entries:
+                if not SUMMARY_NAME_PATTERN.match(entry.name):
+                    continue
+                count += 1
+                mtime = entry.stat().st_mtime
+                if newest_mtime is None or mtime > newest_mtime:
+                    newest, newest_mtime = entry.name, mtime
+    except FileNotFoundError:
+        return {"exists": False, "count": 0, "last": None, "age_days": None}
+
+    age_days = None
+    if newest_mtime is not None:
+        age_days = round((time.time() - newest_mtime) / 86400, 1)
+    return {"exists": True, "count": count, "last": newest, "age_days": age_days}
+
+
+def read_hook_metrics(common_dir: Path) -> Optional[Dict[str, float]]:
+    """Summarise post-commit hook durations recorded by the hook."""
+    try:
+        with open(common_dir / "flowji-ai" / "hook-metrics.json", "r", encoding="utf-8") as f:
+            runs = json.load(f).get("runs", [])
+    except (OSError, ValueError):
+        return None
+    durations = sorted(run["seconds"] for run in runs if isinstance(run.get("seconds"), (int, float)))
+    if not durations:
+        return None
+    return {
+        "runs": len(durations),
+        "p50": durations[len(durations) // 2],
+        "p95": durations[min(len(durations) - 1, int(len(durations) * 0.95))],
+        "max": durations[-1],
+        "last_run": runs[-1].get("finished"),
+    }
+
+
+def scan_repo(deployment: Dict[str, str], expected: Dict[str, Optional[str]], stale_days: float) -> dict:
+    """Collect health information for one deployment."""
+    repo = Path(os.path.expanduser(deployment["path"]))
+    result = {"name": deployment["name"], "path": str(repo), "status": "ok", "issues": []}
+
+    if not repo.is_dir():
+        result.update(status="error", issues=["directory not found"])
+        return result
+    git_dir = find_git_dir(repo)
+    if git_dir is None:
+        result.update(status="error", issues=["not a git repository"])
+        return result
+
+    common_dir = find_common_dir(git_dir)
+    hooks = check_hooks(resolve_hooks_dir(repo, common_dir))
+    result["hooks"] = hooks
+    result["flowji_version"] = read_text(repo / ".flowji-ai/VERSION")
+    result["tool_version"] = read_text(repo / ".flowji-ai/tools/git-commit-summaries/VERSION")
+    config_path = repo / CONFIG_RELATIVE_PATH
+    settings, config_errors = read_config_file(config_path) if config_path.exists() else ({}, [])
+    result["summaries"] = scan_summaries(repo / settings.get("summary_dir", DEFAULT_SUMMARY_SUBDIR))
+    result["hook_latency"] = read_hook_metrics(common_dir)
+
+    issues = result["issues"]
+    issues.extend(f"config.json: {error}" for error in config_errors)
+    errors = False
+    for name in REQUIRED_HOOKS:
+        if not hooks[name]["installed"]:
+            issues.append(f"{name} hook missing")
+            errors = True
+        elif not hooks[name].get("executable"):
+            issues.append(f"{name} hook not executable")
+            errors = True
+        elif expected["tool"] and hooks[name]["version"] not in (expected["tool"], "unknown"):
+            issues.append(f"{name} hook v{hooks[name]['version']} (toolkit v{expected['tool']})")
+    if expected["flowji"] and result["flowji_version"] != expected["flowji"]:
+        issues.append(f".flowji-ai/VERSION {result['flowji_version'] or 'missing'} != {expected['flowji']}")
+    if expected["tool"] and result["tool_version"] != expected["tool"]:
+        issues.append(f"tool VERSION {result['tool_version'] or 'missing'} != {expected['tool']}")
+    summaries = result["summaries"]
+    if not summaries["exists"]:
+        issues.append("summaries directory missing")
+    elif summaries["age_days"] is None:
+        issues.append("no summaries yet")
+    elif summaries["age_days"] > stale_days:
+        issues.append(f"last summary {summaries['age_days']:g} days old")
+
+    if errors:
+        result["status"] = "error"
+    elif issues:
+        result["status"] = "warn"
+    return result
+
+
+def scan_fleet(deployments: List[Dict[str, str]], stale_days: float, workers: int) -> List[dict]:
+    """Scan all deployments concurrently, preserving registry order."""
+    toolkit_root = get_toolkit_root()
+    expected = {
+        "flowji": read_text(toolkit_root / ".flowji-ai/VERSION"),
+        "tool": read_text(Path(__file__).resolve().parent / "VERSION"),
+    }
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        return list(pool.map(lambda deployment: scan_repo(deployment, expected, stale_days), deployments))
+
+
+def print_table(results: List[dict], elapsed: float):
+    """Print a status table in the same style as verify_gc_deployment.py."""
+    icons = {"ok": "✓", "warn": "⚠", "error": "✗"}
+    print("\n" + "=" * 100)
+    print("GIT COMMIT SUMMARIES FLEET STATUS")
+    print("=" * 100)
+    print(f"\n{'':<2} {'Repository':<28} {'Hooks':<12} {'Tool':<8} {'Summaries':<10} {'Last':<10} {'Hook p50':<9} Issues")
+    print("-" * 100)
+
+    for result in results:
+        hooks = result.get("hooks", {})
+        hook_flags = "".join(
+            ("✓" if hooks.get(name, {}).get("installed") else "✗") for name in HOOK_NAMES
+        ) if hooks else "-"
+        summaries = result.get("summaries") or {}
+        age = summaries.get("age_days")
+        latency = result.get("hook_latency")
+        p50 = f"{latency['p50']:.2f}s" if latency else "-"
+        last = f"{age:g}d" if age is not None else "-"
+        print(
+            f"{icons[result['status']]:<2} {result['name'][:28]:<28} {hook_flags:<12} "
+            f"{(result.get('tool_version') or '-'):<8} {summaries.get('count', 0):<10} "
+            f"{last:<10} {p50:<9} "
+            f"{'; '.join(result['issues'])}"
+        )
+
+    print("-" * 100)
+    counts = {status: sum(1 for r in results if r["status"] == status) for status in icons}
+    print(f"Hooks column: {' / '.join(HOOK_NAMES)}")
+    print(
+        f"\n{len(results)} repositories scanned in {elapsed:.2f}s — "
+        f"{counts['ok']} ok, {counts['warn']} warnings, {counts['error']} errors"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Scan all registered deployments for git-commit-summaries health"
+    )
+    parser.add_argument(
+        "--registry",
+        type=Path,
+        metavar="PATH",
+        help="Deployment registry (.json or .md); defaults to deployment-registry.json/.md at the toolkit root"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print results as JSON"
+    )
+    parser.add_argument(
+        "--stale-days",
+        type=float,
+        default=DEFAULT_STALE_DAYS,
+        help=f"Warn when the newest summary is older than this (default: {DEFAULT_STALE_DAYS})"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Repositories scanned in parallel (default: {DEFAULT_WORKERS})"
+    )
+    args = parser.parse_args()
+
+    deployments = load_registry(args.registry)
+    if not deployments:
+        print("❌ No deployments found in registry", file=sys.stderr)
+        sys.exit(1)
+
+    started = time.monotonic()
+    results = scan_fleet(deployments, args.stale_days, args.workers)
+    elapsed = time.monotonic() - started
+
+    if args.json:
+        print(json.dumps({"elapsed_seconds": round(elapsed, 3), "repositories": results}, indent=2))
+    else:
+        print_table(results, elapsed)
+
+    if any(result["status"] == "error" for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,28 @@ set -e  # Exit on any error
 
 TOOL_VERSION=$(cat "$(dirname "${BASH_SOURCE[0]}")/VERSION" 2>/dev/null || echo "unknown")
 
+# Parse arguments
+WITH_PRE_PUSH=false
+
+while [[ $# -gt 0 ]]; do
+    case $1 in
+        --with-pre-push)
+            WITH_PRE_PUSH=true
+            shift
+            ;;
+        -h|--help)
+            echo "Usage: $0 [--with-pre-push]"
+            echo "  --with-pre-push  Also install a pre-push hook that validates every pushed commit"
+            exit 0
+            ;;
+        *)
+            echo "Unknown option: $1" >&2
+            echo "Usage: $0 [--with-pre-push]" >&2
+            exit 1
+            ;;
+    esac
+done
+
 echo "Installing Git commit summary post-commit hook (v$TOOL_VERSION)..."
 
 # Check if we're in a Git repository
@@ -30,23 +52,50 @@ fi
 
 mkdir -p "$HOOKS_DIR"
 
+# Copy a hook template into place, stamping the toolkit version
+install_hook_file() {
+    sed "s/@TOOL_VERSION@/$TOOL_VERSION/" "$1" > "$2"
+    chmod +x "$2"
+}
+
 # Get the path to the hook script relative to the repository root
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 HOOK_SOURCE="$SCRIPT_DIR/hooks/post-commit"
 HOOK_DEST="$HOOKS_DIR/post-commit"
 
-# Copy the hook to the repository's hooks directory
-cp "$HOOK_SOURCE" "$HOOK_DEST"
-
-# Make the hook executable
-chmod +x "$HOOK_DEST"
+# Copy the hook to the repository's hooks directory and make it executable
+install_hook_file "$HOOK_SOURCE" "$HOOK_DEST"
 
 # Install prepare-commit-msg hook for commit template injection
 PREPARE_SOURCE="$SCRIPT_DIR/hooks/prepare-commit-msg"
 PREPARE_DEST="$HOOKS_DIR/prepare-commit-msg"
 if [ -f "$PREPARE_SOURCE" ]; then
-    cp "$PREPARE_SOURCE" "$PREPARE_DEST"
-    chmod +x "$PREPARE_DEST"
+    install_hook_file "$PREPARE_SOURCE" "$PREPARE_DEST"
+fi
+
+# Install post-merge and post-checkout hooks that re-index pulled or switched summaries
+# (post-merge also summarizes merge commits made without a post-commit run)
+for SYNC_HOOK in post-merge post-checkout; do
+    SYNC_SOURCE="$SCRIPT_DIR/hooks/$SYNC_HOOK"
+    SYNC_DEST="$HOOKS_DIR/$SYNC_HOOK"
+    [ -f "$SYNC_SOURCE" ] || continue
+    if [ -f "$SYNC_DEST" ] && ! grep -q "summary_watch.py" "$SYNC_DEST"; then
+        echo "⚠ Existing $SYNC_HOOK hook found at $SYNC_DEST, leaving it unchanged"
+    else
+        install_hook_file "$SYNC_SOURCE" "$SYNC_DEST"
+    fi
+done
+
+# Optionally install pre-push hook for range validation of pushed commits
+if [ "$WITH_PRE_PUSH" = true ]; then
+    PRE_PUSH_SOURCE="$SCRIPT_DIR/hooks/pre-push"
+    PRE_PUSH_DEST="$HOOKS_DIR/pre-push"
+    if [ -f "$PRE_PUSH_DEST" ] && ! grep -q "post_commit_summary.py" "$PRE_PUSH_DEST"; then
+        echo "⚠ Existing pre-push hook found at $PRE_PUSH_DEST, leaving it unchanged"
+    else
+        install_hook_file "$PRE_PUSH_SOURCE" "$PRE_PUSH_DEST"
+        echo "✓ pre-push commit message validation installed"
+    fi
 fi
 
 # Ensure the output directory exists
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Token-Budgeted Context Packer
+
+Selects and compresses the most recent commit summaries so they fit inside a
+token budget. Recent summaries are emitted at the richest level that fits
+(full, without stats, compact file lists); older ones collapse to one-line
+digests. Token estimates are cached in the summary index so packing only reads
+the files it actually emits.
+
+Usage:
+    python3 pack_context.py --budget 8000
+    python3 pack_context.py --budget 4000 --path plugin/includes/
+    python3 pack_context.py --budget 4000 --branch feature/settings-page
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from summary_config import load_config, require_repo_root
+from summary_index import (
+    LEVEL_COMPACT,
+    LEVEL_DIGEST,
+    LEVEL_FULL,
+    LEVEL_NO_STATS,
+    estimate_tokens,
+    load_refreshed_index,
+    parse_summary_file,
+    render_digest,
+    render_level,
+)
+
+
+DEFAULT_BUDGET = 8000
+DEFAULT_DETAILED = 5
+
+DETAILED_LEVELS = (LEVEL_FULL, LEVEL_NO_STATS, LEVEL_COMPACT, LEVEL_DIGEST)
+
+
+def get_summary_dir(repo_root):
+    """Return the summaries directory from .flowji-ai/config.json or GIT_SUMMARY_DIR."""
+    return Path(repo_root) / load_config(repo_root)["summary_dir"]
+
+
+def matches_focus(entry, focus_path=None, branch=None):
+    """Return True if an index entry matches the optional focus filters."""
+    if branch and entry.get("branch") != branch:
+        return False
+    if focus_path:
+        prefix = focus_path.replace("\\", "/")
+        while prefix.startswith("./"):
+            prefix = prefix[2:]
+        prefix = prefix.rstrip("/")
+        # Match whole path segments so "plugin" does not pick up "plugin-old/"
+        if prefix not in ("", ".") and not any(
+            path == prefix or path.startswith(f"{prefix}/") for path in entry.get("paths", [])
+        ):
+            return False
+    return True
+
+
+def plan_pack(entries, budget, detailed=DEFAULT_DETAILED):
+    """Choose a representation level for each entry within the budget.
+
+    ``entries`` must be ordered newest first. Returns a list of
+    ``(entry, level)`` tuples; entries that do not fit are omitted. While
+    choosing a level for a detailed entry, enough budget is reserved for the
+    digests of the remaining detailed slots so one oversized summary cannot
+    starve the rest.
+    """
+    plan = []
+    remaining = budget
+    detailed_entries = entries[:detailed]
+
+    for position, entry in enumerate(entries):
+        tokens = entry["tokens"]
+        if position < detailed:
+            reserve = sum(
+                later["tokens"][LEVEL_DIGEST] for later in detailed_entries[position + 1:]
+            )
+            levels = DETAILED_LEVELS
+        else:
+            reserve = 0
+            levels = (LEVEL_DIGEST,)
+
+        chosen = None
+        for level in levels:
+            if tokens[level] + reserve <= remaining:
+                chosen = level
+                break
+        if chosen is None:
+            if tokens[LEVEL_DIGEST] <= remaining:
+                chosen = LEVEL_DIGEST
+            else:
+                break
+
+        plan.append((entry, chosen))
+        remaining -= tokens[chosen]
+
+    return plan
+
+
+def render_pack(output_dir, plan, budget):
+    """Render the packed context as Markdown."""
+    detailed_parts = []
+    digest_lines = []
+    # A newest summary too large to show in detail is digested too; the
+    # digest heading must not then claim everything under it is older
+    digest_before_detailed = False
+
+    for entry, level in plan:
+        if level == LEVEL_DIGEST:
+            digest_lines.append(render_digest(entry))
+            continue
+        try:
+            parsed, fresh_entry = parse_summary_file(Path(output_dir) / entry["name"])
+        except OSError:
+            digest_lines.append(render_digest(entry))
+            continue
+        if digest_lines:
+            digest_before_detailed = True
+        detailed_parts.append(render_level(parsed, fresh_entry, level))
+
+    body = []
+    body.extend(part.rstrip() + "\n\n" for part in detailed_parts)
+    if digest_lines:
+        body.append("## Other Commits\n\n" if digest_before_detailed else "## Older Commits\n\n")
+        body.extend(digest_lines)
+
+    text = "".join(body)
+    header = (
+        f"<!-- git-summary context: {len(plan)} summaries, "
+        f"~{estimate_tokens(text)} of {budget} tokens -->\n\n"
+    )
+    return header + text
+
+
+def pack_context(repo_root, budget, focus_path=None, branch=None, detailed=DEFAULT_DETAILED):
+    """Return packed Markdown context for the repository's summaries."""
+    output_dir = get_summary_dir(repo_root)
+    if not output_dir.is_dir():
+        return ""
+
+    index = load_refreshed_index(repo_root, output_dir)
+    entries = [
+        entry
+        for name, entry in sorted(index["entries"].items(), reverse=True)
+        if matches_focus(entry, focus_path, branch)
+    ]
+    plan = plan_pack(entries, budget, detailed=detailed)
+    if not plan:
+        return ""
+    return render_pack(output_dir, plan, budget)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Pack recent commit summaries into a token budget for agent context."
+    )
+    parser.add_argument(
+        "--budget",
+        type=int,
+        default=DEFAULT_BUDGET,
+        help=f"Approximate token budget (default: {DEFAULT_BUDGET}).",
+    )
+    parser.add_argument(
+        "--path",
+        dest="focus_path",
+        metavar="PATH",
+        help="Only include summaries that touched files under PATH.",
+    )
+    parser.add_argument(
+        "--branch",
+        help="Only include summaries recorded on BRANCH.",
+    )
+    parser.add_argument(
+        "--detailed",
+        type=int,
+        default=DEFAULT_DETAILED,
+        help=f"Number of recent summaries eligible for detailed output (default: {DEFAULT_DETAILED}).",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.budget <= 0:
+        print("[pack-context] Error: --budget must be positive", file=sys.stderr)
+        return 1
+
+    repo_root = require_repo_root("pack-context")
+    output = pack_context(
+        repo_root,
+        args.budget,
+        focus_path=args.focus_path,
+        branch=args.branch,
+        detailed=max(args.detailed, 0),
+    )
+    if output:
+        sys.stdout.write(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
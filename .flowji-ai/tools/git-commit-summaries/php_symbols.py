@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+PHP Symbol Change Extraction
+
+Maps a commit's PHP diff hunks onto the classes, methods and functions they
+touch, and picks up WordPress hook registrations (``add_action``,
+``apply_filters`` ...) from the changed lines. Blob parse results are cached by
+blob SHA under the git directory, so a blob is parsed at most once no matter
+how many commits touch it, and blobs over the size cap are never read.
+"""
+import bisect
+import json
+import os
+import re
+import subprocess
+import threading
+from urllib.parse import quote
+
+from summary_config import find_git_dir
+
+
+CACHE_VERSION = 2
+CACHE_FILENAME = "php-symbols-cache.json"
+CACHE_MAX_ENTRIES = 5000
+
+DEFAULT_MAX_BLOB_BYTES = 512 * 1024
+DEFAULT_MAX_FILES = 200
+MAX_DIFF_LINES = 50000
+MAX_SYMBOLS_PER_FILE = 20
+
+ZERO_SHA = "0" * 40
+ANONYMOUS_CLASS = "class@anonymous"
+
+DECLARATION_PATTERN = re.compile(
+    r'(?<![\w$>:\\])(?:(class|interface|trait|enum)\s+([A-Za-z_]\w*)|function\s*&?\s*([A-Za-z_]\w*)\s*\('
+    r'|new\s+(class)\b)'
+)
+BODY_START_PATTERN = re.compile(r'[{;]')
+HOOK_PATTERN = re.compile(
+    r'\b(add_action|add_filter|remove_action|remove_filter|do_action|apply_filters)\s*\(\s*[\'"]([^\'"]+)[\'"]'
+)
+HEREDOC_PATTERN = re.compile(r'<<<[ \t]*[\'"]?([A-Za-z_]\w*)[\'"]?\r?\n')
+HUNK_PATTERN = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+# Combined (merge) hunks: one "-start,count" range per parent, then the result
+COMBINED_HUNK_PATTERN = re.compile(r'^@@@+ -(\d+)(?:,(\d+))? (?:-\d+(?:,\d+)? )*\+(\d+)(?:,(\d+))? @@@+')
+
+
+def _sanitize(source):
+    """Blank out inline HTML, comments and string literals, keeping offsets and newlines."""
+    out = list(source)
+    length = len(source)
+
+    def blank(start, end):
+        for j in range(start, end):
+            if out[j] != "\n":
+                out[j] = " "
+
+    # Everything before the first open tag is inline HTML
+    i = source.find("<?")
+    if i == -1:
+        blank(0, length)
+        return "".join(out)
+    blank(0, i)
+
+    while i < length:
+        ch = source[i]
+        if ch == "?" and source.startswith("?>", i):
+            end = source.find("<?", i + 2)
+            end = length if end == -1 else end
+            blank(i + 2, end)
+            i = end + 2
+        elif ch == "/" and source.startswith("//", i) or ch == "#" and not source.startswith("#[", i):
+            end = source.find("\n", i)
+            close = source.find("?>", i)
+            end = length if end == -1 else end
+            if close != -1 and close < end:
+                end = close
+            blank(i, end)
+            i = end
+        elif ch == "/" and source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            end = length if end == -1 else end + 2
+            blank(i, end)
+            i = end
+        elif ch == "<" and source.startswith("<<<", i):
+            heredoc = HEREDOC_PATTERN.match(source, i)
+            if not heredoc:
+                i += 3
+                continue
+            closing_tag = re.compile(r'^[ \t]*' + heredoc.group(1) + r'\b', re.MULTILINE)
+            end_match = closing_tag.search(source, heredoc.end())
+            end = length if end_match is None else end_match.start()
+            blank(heredoc.end(), end)
+            i = length if end_match is None else end_match.end()
+        elif ch in ("'", '"'):
+            j = i + 1
+            while j < length and source[j] != ch:
+                j += 2 if source[j] == "\\" else 1
+            blank(i + 1, min(j, length))
+            i = j + 1
+        else:
+            i += 1
+    return "".join(out)
+
+
+def parse_php_symbols(source):
+    """Return ``[kind, name, start_line, end_line]`` for each declaration.
+
+    Methods are qualified with their enclosing class (``Class::method``);
+    ``new class`` bodies are not reported themselves, but own their methods
+    as ``class@anonymous::method``.
+    A lightweight scanner, not a full PHP parser: comments and strings are
+    blanked before matching braces, which is enough for well-formed plugin code.
+    """
+    code = _sanitize(source)
+    line_starts = [0] + [m.end() for m in re.finditer("\n", code)]
+
+    def line_of(offset):
+        return bisect.bisect_right(line_starts, offset)
+
+    closing = {}
+    stack = []
+    for index, ch in enumerate(code):
+        if ch == "{":
+            stack.append(index)
+        elif ch == "}" and stack:
+            closing[stack.pop()] = index
+
+    symbols = []
+    containers = []
+    for match in DECLARATION_PATTERN.finditer(code):
+        body = BODY_START_PATTERN.search(code, match.end())
+        start_line = line_of(match.start())
+        if body is None or body.group() == ";":
+            end_line = line_of(body.start()) if body else start_line
+        else:
+            end_line = line_of(closing.get(body.start(), len(code) - 1))
+
+        if match.group(4):
+            containers.append((start_line, end_line, ANONYMOUS_CLASS))
+            continue
+        if match.group(1):
+            kind, name = match.group(1), match.group(2)
+            containers.append((start_line, end_line, name))
+        else:
+            kind, name = "function", match.group(3)
+            owner = next(
+                (c for c in reversed(containers) if c[0] <= start_line <= c[1]),
+                None,
+            )
+            if owner:
+                kind, name = "method", f"{owner[2]}::{name}"
+        symbols.append([kind, name, start_line, end_line])
+    return symbols
+
+
+def _load_cache(cache_path):
+    if cache_path is None or not cache_path.exists():
+        return {"version": CACHE_VERSION, "blobs": {}}
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {"version": CACHE_VERSION, "blobs": {}}
+    if data.get("version") != CACHE_VERSION:
+        return {"version": CACHE_VERSION, "blobs": {}}
+    return data
+
+
+def _save_cache(cache_path, cache):
+    if cache_path is None:
+        return
+    blobs = cache["blobs"]
+    if len(blobs) > CACHE_MAX_ENTRIES:
+        for key in list(blobs)[: len(blobs) - CACHE_MAX_ENTRIES]:
+            del blobs[key]
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, separators=(",", ":"))
+    os.replace(tmp_path, cache_path)
+
+
+def _read_blobs(shas, max_bytes):
+    """Return ``{sha: text or None}``; blobs over ``max_bytes`` map to None.
+
+    Sizes come from one ``cat-file --batch-check`` call; only blobs under the
+    cap are then streamed through one ``cat-file --batch`` call. Blobs git
+    cannot find (shallow or partial clones) are left out of the result.
+    """
+    if not shas:
+        return {}
+    check = subprocess.run(
+        ["git", "cat-file", "--batch-check"],
+        input="".join(f"{sha}\n" for sha in shas),
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    results = {}
+    wanted = []
+    for line in check.stdout.splitlines():
+        parts = line.split()
+        if len(parts) != 3 or parts[1] != "blob":
+            continue
+        if int(parts[2]) <= max_bytes:
+            wanted.append(parts[0])
+        else:
+            results[parts[0]] = None
+    if not wanted:
+        return results
+
+    batch = subprocess.run(
+        ["git", "cat-file", "--batch"],
+        input="".join(f"{sha}\n" for sha in wanted).encode(),
+        capture_output=True,
+        check=True
+    )
+    data = batch.stdout
+    position = 0
+    for sha in wanted:
+        header_end = data.index(b"\n", position)
+        size = int(data[position:header_end].split()[2])
+        start = header_end + 1
+        results[sha] = data[start:start + size].decode("utf-8", errors="replace")
+        position = start + size + 1
+    return results
+
+
+def _diff_args(rev, parents, combined=False):
+    base = ["git", "diff-tree", "-r", "-p", "-U0", "--no-color", "--full-index", "--no-commit-id", "--no-renames"]
+    if combined:
+        return base + ["-c", rev, "--", "*.php"]
+    if parents:
+        return base + [parents[0], rev, "--", "*.php"]
+    return base + ["--root", rev, "--", "*.php"]
+
+
+def parse_php_diff(rev, parents, max_files=DEFAULT_MAX_FILES, timeout=None, combined=False):
+    """Stream the commit's PHP diff into per-file hunk ranges and hook lines.
+
+    With ``combined`` the merge's combined diff is read instead of the diff
+    against the first parent, so only the merge's own resolutions count; old
+    line numbers and blobs then refer to the first parent. A ``timeout`` kills
+    the diff once it runs out and marks the result truncated.
+
+    Returns ``(files, truncated)``; each file dict has ``path``, ``old_blob``,
+    ``new_blob``, ``old_lines``/``new_lines`` (changed line numbers) and
+    ``hooks`` (``(sign, function, hook)`` tuples).
+    """
+    process = subprocess.Popen(
+        _diff_args(rev, parents, combined),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        errors="replace"
+    )
+    expired = []
+    timer = None
+    if timeout is not None:
+        timer = threading.Timer(timeout, lambda: (expired.append(True), process.kill()))
+        timer.start()
+
+    hunk_pattern = COMBINED_HUNK_PATTERN if combined else HUNK_PATTERN
+    # Combined diff lines carry one +/- column per parent
+    width = len(parents) if combined else 1
+    files = []
+    current = None
+    truncated = False
+
+    for count, line in enumerate(process.stdout):
+        if count >= MAX_DIFF_LINES:
+            truncated = True
+            break
+        if line.startswith(("diff --git ", "diff --combined ", "diff --cc ")):
+            if len(files) >= max_files:
+                truncated = True
+                break
+            current = {"path": None, "old_blob": None, "new_blob": None,
+                       "old_lines": set(), "new_lines": set(), "hooks": []}
+            files.append(current)
+        elif current is None:
+            continue
+        elif line.startswith("index "):
+            old_blobs, _, new_blob = line.split()[1].partition("..")
+            current["old_blob"], current["new_blob"] = old_blobs.split(",")[0], new_blob
+        elif line.startswith("+++ ") or line.startswith("--- "):
+            path = line[4:].rstrip("\n")
+            if path != "/dev/null":
+                current["path"] = path[2:]
+        elif line.startswith("@@"):
+            match = hunk_pattern.match(line)
+            if match:
+                old_start, old_count = int(match.group(1)), int(match.group(2) or 1)
+                new_start, new_count = int(match.group(3)), int(match.group(4) or 1)
+                current["old_lines"].update(range(old_start, old_start + old_count))
+                # A pure deletion still touches whatever encloses the deletion point
+                current["new_lines"].update(range(new_start, new_start + new_count) if new_count else (max(new_start, 1),))
+        else:
+            prefix = line[:width]
+            sign = "+" if "+" in prefix else "-" if "-" in prefix else None
+            if sign:
+                for hook in HOOK_PATTERN.finditer(line):
+                    current["hooks"].append((sign, hook.group(1), hook.group(2)))
+
+    process.stdout.close()
+    if process.poll() is None:
+        process.kill()
+    process.wait()
+    if timer is not None:
+        timer.cancel()
+    return [f for f in files if f["path"]], truncated or bool(expired)
+
+
+def _innermost(symbols, line_numbers):
+    """Return ``(kind, name)`` of the innermost symbols covering any of the lines.
+
+    Each symbol only visits the changed lines inside its own range, so the cost
+    stays proportional to changed lines times nesting depth.
+    """
+    lines = sorted(line_numbers)
+    owner = {}
+    for symbol in symbols:
+        low = bisect.bisect_left(lines, symbol[2])
+        high = bisect.bisect_right(lines, symbol[3])
+        span = symbol[3] - symbol[2]
+        for number in lines[low:high]:
+            current = owner.get(number)
+            if current is None or span < current[3] - current[2]:
+                owner[number] = symbol
+
+    names = []
+    for number in lines:
+        symbol = owner.get(number)
+        if symbol is not None and (symbol[0], symbol[1]) not in names:
+            names.append((symbol[0], symbol[1]))
+    return names
+
+
+def _format_symbol(kind, name):
+    if kind in ("function", "method"):
+        return f"{name}()"
+    return f"{kind} {name}"
+
+
+def extract_symbol_changes(repo_root, rev, parents=None, max_blob_bytes=DEFAULT_MAX_BLOB_BYTES,
+                           max_files=DEFAULT_MAX_FILES, timeout=None, combined=False):
+    """Return per-file PHP symbol changes for a commit.
+
+    Result: ``{"files": [{"path", "symbols", "hooks", "skipped"}], "truncated": bool}``
+    where ``symbols`` is a list of ``(label, change)`` with change one of
+    ``added``, ``removed`` or ``modified``, and ``skipped`` is False, ``"size"``
+    (blob over the cap) or ``"missing"`` (blob not in the object store).
+    ``timeout`` and ``combined`` are passed to ``parse_php_diff()``.
+    """
+    files, truncated = parse_php_diff(rev, parents, max_files=max_files, timeout=timeout, combined=combined)
+    if not files:
+        return {"files": [], "truncated": truncated}
+
+    git_dir = find_git_dir(repo_root)
+    cache_path = git_dir / "flowji-ai" / CACHE_FILENAME if git_dir else None
+    cache = _load_cache(cache_path)
+    blobs = cache["blobs"]
+
+    needed = {
+        sha
+        for f in files
+        for sha in (f["old_blob"], f["new_blob"])
+        if sha and sha != ZERO_SHA and sha not in blobs
+    }
+    missing = set()
+    if needed:
+        read = _read_blobs(sorted(needed), max_blob_bytes)
+        # Missing blobs are not cached: a later fetch may make them available
+        missing = needed - read.keys()
+        for sha, text in read.items():
+            blobs[sha] = parse_php_symbols(text) if text is not None else None
+        try:
+            _save_cache(cache_path, cache)
+        except OSError:
+            pass
+
+    results = []
+    for f in files:
+        old_symbols = blobs.get(f["old_blob"]) if f["old_blob"] != ZERO_SHA else []
+        new_symbols = blobs.get(f["new_blob"]) if f["new_blob"] != ZERO_SHA else []
+        entry = {"path": f["path"], "symbols": [], "hooks": f["hooks"], "skipped": False}
+        if f["old_blob"] in missing or f["new_blob"] in missing:
+            entry["skipped"] = "missing"
+        elif old_symbols is None or new_symbols is None:
+            entry["skipped"] = "size"
+        if entry["skipped"]:
+            results.append(entry)
+            continue
+
+        old_names = {(s[0], s[1]) for s in old_symbols}
+        new_names = {(s[0], s[1]) for s in new_symbols}
+        touched = _innermost(new_symbols, f["new_lines"])
+        touched += [key for key in _innermost(old_symbols, f["old_lines"]) if key not in touched]
+
+        for kind, name in touched:
+            if (kind, name) not in old_names:
+                change = "added"
+            elif (kind, name) not in new_names:
+                change = "removed"
+            else:
+                change = "modified"
+            entry["symbols"].append((_format_symbol(kind, name), change))
+        results.append(entry)
+
+    return {"files": results, "truncated": truncated}
+
+
+def format_symbols_section(symbol_changes, numstat=None):
+    """Return Markdown lines for the "Symbols Changed" section."""
+    numstat = numstat or {}
+    lines = ["## Symbols Changed", ""]
+    for entry in symbol_changes["files"]:
+        path = entry["path"]
+        stats = numstat.get(path)
+        stat_label = f" (+{stats[0]}/-{stats[1]})" if stats and stats[0] is not None else ""
+        header = f"- [{path}](./{quote(path)}){stat_label}"
+        if entry["skipped"] == "missing":
+            lines.append(f"{header}: (skipped: blob not available)")
+            continue
+        if entry["skipped"]:
+            lines.append(f"{header}: (skipped: file larger than size cap)")
+            continue
+
+        parts = [f"{label} ({change})" for label, change in entry["symbols"][:MAX_SYMBOLS_PER_FILE]]
+        if len(entry["symbols"]) > MAX_SYMBOLS_PER_FILE:
+            parts.append(f"... and {len(entry['symbols']) - MAX_SYMBOLS_PER_FILE} more")
+        hooks = sorted({f"{sign}{hook}" for sign, _, hook in entry["hooks"]})
+        if hooks:
+            parts.append("hooks: " + ", ".join(hooks))
+        lines.append(f"{header}: {', '.join(parts) if parts else '(no symbol-level changes)'}")
+    if symbol_changes["truncated"]:
+        lines.append("- ... PHP diff truncated at the file/line cap or time limit")
+    lines.append("")
+    return lines
@@ -6,39 +6,38 @@ This script processes the latest Git commit and creates a structured Markdown su
 in the configured summaries directory (default `.flowji-ai/memory/git-summaries/`) with commit metadata, file changes, and stats.
 """
 import argparse
+import fnmatch
+import json
 import os
 import re
 import subprocess
 import sys
+import tempfile
+import time
 from urllib.parse import quote
 from datetime import datetime
 from pathlib import Path
 
-
-def get_git_repo_root():
-    """Get the repository root using git rev-parse --show-toplevel."""
-    try:
-        result = subprocess.run(
-            ["git", "rev-parse", "--show-toplevel"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout.strip()
-    except subprocess.CalledProcessError:
-        print("[post-commit-summary] Error: Not in a Git repository")
-        sys.exit(1)
-
-
-DEFAULT_SUMMARY_SUBDIR = ".flowji-ai/memory/git-summaries"
+from php_symbols import extract_symbol_changes, format_symbols_section
+from summary_archive import archive_summaries
+from summary_config import (
+    DEFAULTS as CONFIG_DEFAULTS,
+    find_git_common_dir,
+    find_git_dir,
+    load_config,
+    require_repo_root,
+    summary_commit_lock,
+)
+from summary_index import load_refreshed_index
+from summary_rollups import record_from_commit, update_rollups
 
 
 def get_summary_subdir():
-    """Return the configured summary subdirectory relative to repo root."""
-    override = os.environ.get("GIT_SUMMARY_DIR", "").strip()
-    if override:
-        return override
-    return DEFAULT_SUMMARY_SUBDIR
+    """Return the configured summary subdirectory relative to repo root.
+
+    Set by ``summary_dir`` in .flowji-ai/config.json or GIT_SUMMARY_DIR.
+    """
+    return load_config()["summary_dir"]
 
 
 SUMMARY_SUBDIR = get_summary_subdir()
@@ -58,10 +57,21 @@ def has_escaped_newlines(message):
     return "\\n" in without_inline
 
 
-def get_latest_commit_subject():
+def get_head_sha():
+    """Resolve HEAD once so later lookups are unaffected by concurrent commits."""
+    result = subprocess.run(
+        ["git", "rev-parse", "HEAD"],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return result.stdout.strip()
+
+
+def get_latest_commit_subject(rev="HEAD"):
     """Return latest commit subject."""
     result = subprocess.run(
-        ["git", "log", "-1", "--pretty=%s"],
+        ["git", "log", "-1", "--pretty=%s", rev],
         capture_output=True,
         text=True,
         check=True
@@ -69,10 +79,10 @@ def get_latest_commit_subject():
     return result.stdout.strip()
 
 
-def get_latest_commit_message():
+def get_latest_commit_message(rev="HEAD"):
     """Return latest commit full body."""
     result = subprocess.run(
-        ["git", "log", "-1", "--format=%B", "HEAD"],
+        ["git", "log", "-1", "--format=%B", rev],
         capture_output=True,
         text=True,
         check=True
@@ -80,11 +90,11 @@ def get_latest_commit_message():
     return result.stdout
 
 
-def is_merge_commit():
+def is_merge_commit(rev="HEAD"):
     """Determine if HEAD is a merge commit by counting parents."""
     try:
         result = subprocess.run(
-            ["git", "rev-list", "--parents", "-1", "HEAD"],
+            ["git", "rev-list", "--parents", "-1", rev],
             capture_output=True,
             text=True,
             check=True
@@ -95,13 +105,13 @@ def is_merge_commit():
         return False
 
 
-def should_skip_validation(current_subject):
+def should_skip_validation(current_subject, rev="HEAD"):
     """
     Returns True when validation should be skipped (merge commits or auto summaries).
     """
     if current_subject.startswith("[git-summary]"):
         return True
-    return is_merge_commit()
+    return is_merge_commit(rev)
 
 
 def _print_escaped_newline_error():
@@ -131,28 +141,155 @@ def _print_escaped_newline_error():
     print(banner + "\n", file=sys.stderr)
 
 
-def validate_latest_commit(current_subject, quiet=False):
+ZERO_SHA = "0" * 40
+
+
+def iter_range_commits(rev_args):
+    """Yield ``(sha, parents, message)`` for a revision range from one ``git log -z``."""
+    result = subprocess.run(
+        ["git", "log", "-z", "--format=%H%x1f%P%x1f%B", *rev_args, "--"],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    for record in result.stdout.split("\0"):
+        if not record.strip():
+            continue
+        sha, parents, message = record.lstrip("\n").split("\x1f", 2)
+        yield sha, parents.split(), message
+
+
+def validate_commit_range(rev_args):
+    """Validate every commit in a range, skipping merges and summary commits.
+
+    Returns ``(offenders, checked, skipped)`` where offenders is a list of
+    ``(sha, subject)`` tuples.
+    """
+    offenders = []
+    checked = 0
+    skipped = 0
+
+    for sha, parents, message in iter_range_commits(rev_args):
+        subject = message.split("\n", 1)[0].strip()
+        if subject.startswith("[git-summary]") or len(parents) > 1:
+            skipped += 1
+            continue
+        checked += 1
+        if has_escaped_newlines(message):
+            offenders.append((sha, subject))
+
+    return offenders, checked, skipped
+
+
+def _print_range_offenders(offenders):
+    """Emit one error listing every commit with escaped newlines."""
+    banner = "=" * 80
+    print(banner, file=sys.stderr)
+    print(
+        f"❌ ERROR: Escaped newlines detected in {len(offenders)} commit message(s)",
+        file=sys.stderr,
+    )
+    print(banner, file=sys.stderr)
+    print("", file=sys.stderr)
+    for sha, subject in offenders:
+        print(f"  {sha[:12]}  {subject}", file=sys.stderr)
+    print("\nTo fix, reword each listed commit before pushing:", file=sys.stderr)
+    print("  git rebase -i <oldest-listed-sha>~1", file=sys.stderr)
+    print("  # Mark the listed commits as 'reword' and use real newlines", file=sys.stderr)
+    print(
+        "\nDetails: .flowji-ai/tools/git-commit-summaries/AGENTS.md#escaped-newlines",
+        file=sys.stderr,
+    )
+    print(banner + "\n", file=sys.stderr)
+
+
+def run_validate_range(rev_args):
+    """CLI helper for range validation mode."""
+    try:
+        offenders, checked, skipped = validate_commit_range(rev_args)
+    except subprocess.CalledProcessError as exc:
+        print(f"[post-commit-summary] Validation failed: {exc.stderr.strip() or exc}", file=sys.stderr)
+        return 1
+
+    if offenders:
+        _print_range_offenders(offenders)
+        return 1
+
+    print(f"✓ No escaped newlines found ({checked} checked, {skipped} skipped)")
+    return 0
+
+
+def _pre_push_rev_args(remote, local_sha, remote_sha):
+    """Return rev-list arguments for one pre-push ref update, or None to skip."""
+    if local_sha == ZERO_SHA:
+        return None
+    if remote_sha != ZERO_SHA:
+        known = subprocess.run(
+            ["git", "cat-file", "-e", f"{remote_sha}^{{commit}}"],
+            capture_output=True
+        ).returncode == 0
+        if known:
+            return [f"{remote_sha}..{local_sha}"]
+    # New branch (or unknown remote tip): only check commits no remote branch has
+    return [local_sha, "--not", f"--remotes={remote}"] if remote else [local_sha, "--not", "--remotes"]
+
+
+def run_pre_push(remote, stdin=None):
+    """Validate every commit being pushed, reading ref updates from stdin."""
+    stdin = stdin or sys.stdin
+    offenders = []
+    checked = 0
+    skipped = 0
+
+    try:
+        for line in stdin:
+            parts = line.split()
+            if len(parts) != 4:
+                continue
+            _, local_sha, _, remote_sha = parts
+            rev_args = _pre_push_rev_args(remote, local_sha, remote_sha)
+            if rev_args is None:
+                continue
+            found, ref_checked, ref_skipped = validate_commit_range(rev_args)
+            offenders.extend(item for item in found if item not in offenders)
+            checked += ref_checked
+            skipped += ref_skipped
+    except subprocess.CalledProcessError as exc:
+        print(f"[post-commit-summary] Validation failed: {exc.stderr.strip() or exc}", file=sys.stderr)
+        return 1
+
+    if offenders:
+        _print_range_offenders(offenders)
+        print("[post-commit-summary] Push rejected; fix the commits above and push again.", file=sys.stderr)
+        return 1
+
+    if checked:
+        print(f"[post-commit-summary] ✓ {checked} pushed commit(s) validated ({skipped} skipped)")
+    return 0
+
+
+def validate_latest_commit(current_subject, quiet=False, rev="HEAD"):
     """Validate commit message formatting, skipping merges and summaries."""
-    if should_skip_validation(current_subject):
+    if should_skip_validation(current_subject, rev):
         if not quiet and not current_subject.startswith("[git-summary]"):
             print(
                 "[post-commit-summary] Skipping escaped newline validation for merge commit"
             )
         return True
 
-    message = get_latest_commit_message()
+    message = get_latest_commit_message(rev)
     if has_escaped_newlines(message):
         _print_escaped_newline_error()
         return False
     return True
 
 
-def get_commit_info():
+def get_commit_info(rev="HEAD"):
     """Get commit metadata (SHA, author, timestamp, message, branch)."""
     try:
         # Get full commit SHA
         sha_full = subprocess.run(
-            ["git", "rev-parse", "HEAD"],
+            ["git", "rev-parse", rev],
             capture_output=True,
             text=True,
             check=True
@@ -160,7 +297,7 @@ def get_commit_info():
         
         # Get short commit SHA
         sha_short = subprocess.run(
-            ["git", "rev-parse", "--short", "HEAD"],
+            ["git", "rev-parse", "--short", rev],
             capture_output=True,
             text=True,
             check=True
@@ -168,14 +305,14 @@ def get_commit_info():
         
         # Get author name and email
         author_name = subprocess.run(
-            ["git", "log", "-1", "--pretty=format:%an", "HEAD"],
+            ["git", "log", "-1", "--pretty=format:%an", rev],
             capture_output=True,
             text=True,
             check=True
         ).stdout.strip()
         
         author_email = subprocess.run(
-            ["git", "log", "-1", "--pretty=format:%ae", "HEAD"],
+            ["git", "log", "-1", "--pretty=format:%ae", rev],
             capture_output=True,
             text=True,
             check=True
@@ -183,7 +320,7 @@ def get_commit_info():
         
         # Get commit timestamp in ISO 8601 format
         timestamp_raw = subprocess.run(
-            ["git", "log", "-1", "--pretty=format:%ai", "HEAD"],
+            ["git", "log", "-1", "--pretty=format:%ai", rev],
             capture_output=True,
             text=True,
             check=True
@@ -195,14 +332,14 @@ def get_commit_info():
         
         # Get commit message subject (first line) and full message
         subject = subprocess.run(
-            ["git", "log", "-1", "--pretty=format:%s", "HEAD"],
+            ["git", "log", "-1", "--pretty=format:%s", rev],
             capture_output=True,
             text=True,
             check=True
         ).stdout.strip()
         
         full_message = subprocess.run(
-            ["git", "log", "-1", "--pretty=format:%b", "HEAD"],
+            ["git", "log", "-1", "--pretty=format:%b", rev],
             capture_output=True,
             text=True,
             check=True
@@ -218,7 +355,7 @@ def get_commit_info():
 
         # Get parent SHAs (could be empty for initial commit)
         parents_raw = subprocess.run(
-            ["git", "log", "-1", "--pretty=format:%P", "HEAD"],
+            ["git", "log", "-1", "--pretty=format:%P", rev],
             capture_output=True,
             text=True,
             check=True
@@ -241,97 +378,276 @@ def get_commit_info():
         sys.exit(1)
 
 
-def get_file_changes():
-    """Parse git show to get file changes grouped by status."""
+def _empty_changes():
+    return {
+        "created": [],
+        "edited": [],
+        "deleted": [],
+        "renamed": [],
+        "other": []
+    }
+
+
+def parse_name_status(lines):
+    """Group ``--name-status`` output lines into created/edited/deleted/renamed/other."""
+    changes = _empty_changes()
+
+    for line in lines:
+        line = line.strip()
+        parts = line.split('\t')
+        if len(parts) >= 2:
+            status = parts[0].strip()
+            if status.startswith('R') and len(parts) >= 3:
+                old_path = parts[1].strip()
+                new_path = parts[2].strip()
+                if (
+                    not should_ignore_file(old_path)
+                    and not should_ignore_file(new_path)
+                    and not _is_summary_path(old_path)
+                    and not _is_summary_path(new_path)
+                ):
+                    changes["renamed"].append((old_path, new_path))
+                continue
+
+            filepath = parts[-1].strip()
+            if should_ignore_file(filepath) or _is_summary_path(filepath):
+                continue
+
+            status_char = status[0] if status else ""
+
+            if status_char == "A":
+                changes["created"].append(filepath)
+            elif status_char == "M":
+                changes["edited"].append(filepath)
+            elif status_char == "D":
+                changes["deleted"].append(filepath)
+            else:
+                changes["other"].append(f"{status}: {filepath}")
+
+    return changes
+
+
+def get_file_changes(rev="HEAD", parents=None):
+    """Parse git show to get file changes grouped by status.
+
+    Merge commits (more than one parent) are handed to
+    ``get_merge_file_changes()`` so their cost stays bounded.
+    """
+    if parents and len(parents) > 1:
+        return get_merge_file_changes(rev, parents)
+
     try:
         result = subprocess.run(
-            ["git", "show", "--name-status", "--pretty=format:", "HEAD"],
+            ["git", "show", "--name-status", "--pretty=format:", rev],
             capture_output=True,
             text=True,
             check=True
         )
-
-        lines = [line.strip() for line in result.stdout.splitlines() if line.strip()]
-        changes = {
-            "created": [],
-            "edited": [],
-            "deleted": [],
-            "renamed": [],
-            "other": []
-        }
-
-        for line in lines:
-            parts = line.split('\t')
-            if len(parts) >= 2:
-                status = parts[0].strip()
-                if status.startswith('R') and len(parts) >= 3:
-                    old_path = parts[1].strip()
-                    new_path = parts[2].strip()
-                    if (
-                        not should_ignore_file(old_path)
-                        and not should_ignore_file(new_path)
-                        and not _is_summary_path(old_path)
-                        and not _is_summary_path(new_path)
-                    ):
-                        changes["renamed"].append((old_path, new_path))
-                    continue
-
-                filepath = parts[-1].strip()
-                if should_ignore_file(filepath) or _is_summary_path(filepath):
-                    continue
-
-                status_char = status[0] if status else ""
-
-                if status_char == "A":
-                    changes["created"].append(filepath)
-                elif status_char == "M":
-                    changes["edited"].append(filepath)
-                elif status_char == "D":
-                    changes["deleted"].append(filepath)
-                else:
-                    changes["other"].append(f"{status}: {filepath}")
-
-        return changes
+        return parse_name_status(result.stdout.splitlines())
     except subprocess.CalledProcessError as e:
         print(f"[post-commit-summary] Error getting file changes: {e}")
         sys.exit(1)
 
 
-def should_ignore_file(filepath):
-    """Check if a file should be ignored based on common ignore patterns."""
-    import fnmatch
-    
-    ignore_patterns = {
-        ".DS_Store",
-        "Thumbs.db",
-        ".DS_Store?",
-        ".DS_Store_?",
-        "Icon?",
-        ".Spotlight-V100",
-        ".Trashes",
-        "ehthumbs.db",
-        "Thumbs.db:encryptable",
-        ".fseventsd",
-        ".TemporaryItems",
-        ".Trashes"
+MERGE_MODE_FIRST_PARENT = "first-parent"
+MERGE_MODE_PER_PARENT = "per-parent"
+MERGE_MODE_CONFLICT_RESOLUTION = "conflict-resolution"
+
+
+def get_merge_settings():
+    """Return ``(mode, max_files, timeout)`` for merge summaries.
+
+    Set by ``merge_mode``, ``merge_max_files`` and ``merge_timeout`` (seconds) in
+    .flowji-ai/config.json, or GIT_SUMMARY_MERGE_MODE, GIT_SUMMARY_MERGE_MAX_FILES
+    and GIT_SUMMARY_MERGE_TIMEOUT; invalid values fall back to defaults.
+    """
+    config = load_config()
+    return config["merge_mode"], config["merge_max_files"], config["merge_timeout"]
+
+
+def _run_git_capped(args, max_lines, timeout):
+    """Stream a git command's output, stopping at ``max_lines`` or ``timeout``.
+
+    Returns ``(lines, truncated, timed_out)``. The process is killed as soon as
+    either limit is hit, so huge diffs never run to completion.
+    """
+    import threading
+
+    process = subprocess.Popen(
+        args,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True
+    )
+    lines = []
+    state = {"truncated": False}
+
+    def _reader():
+        for line in process.stdout:
+            if not line.strip():
+                continue
+            if len(lines) >= max_lines:
+                state["truncated"] = True
+                process.kill()
+                break
+            lines.append(line.rstrip("\n"))
+
+    reader = threading.Thread(target=_reader, daemon=True)
+    reader.start()
+    reader.join(timeout)
+    timed_out = reader.is_alive()
+    if timed_out:
+        process.kill()
+        reader.join(1)
+    process.wait()
+    return list(lines), state["truncated"], timed_out
+
+
+def _merge_pathspec():
+    """Pathspec that keeps generated summaries out of capped merge diffs."""
+    subdir = SUMMARY_SUBDIR.replace("\\", "/").rstrip("/")
+    while subdir.startswith("./"):
+        subdir = subdir[2:]
+    if not subdir or os.path.isabs(subdir):
+        return []
+    return ["--", ".", f":(exclude){subdir}"]
+
+
+def _count_changes(changes):
+    return {
+        "created": len(changes["created"]),
+        "edited": len(changes["edited"]),
+        "deleted": len(changes["deleted"]),
+        "renamed": len(changes["renamed"]),
+        "other": len(changes["other"]),
     }
-    
+
+
+def get_merge_file_changes(rev, parents, mode=None, max_files=None, timeout=None):
+    """Return file changes for a merge commit using a bounded diff mode.
+
+    Modes:
+    - ``first-parent``: what the merge brought into the first parent's branch.
+    - ``per-parent``: first-parent listing plus change counts against every parent.
+    - ``conflict-resolution``: only files that differ from all parents (combined
+      diff), i.e. the manual resolutions made in the merge itself.
+
+    Every diff is capped at ``max_files`` entries and all diffs share one
+    ``timeout`` budget; the result carries a ``merge`` entry describing the mode
+    and whether the listing is incomplete, plus the budget's ``deadline`` for
+    the symbol diff that follows.
+    """
+    default_mode, default_max, default_timeout = get_merge_settings()
+    mode = mode or default_mode
+    max_files = max_files or default_max
+    timeout = timeout or default_timeout
+    deadline = time.monotonic() + timeout
+
+    def remaining():
+        return max(deadline - time.monotonic(), 0.01)
+
+    merge_info = {
+        "mode": mode,
+        "max_files": max_files,
+        "timeout": timeout,
+        "parents": [],
+        "truncated": False,
+        "timed_out": False,
+        "deadline": deadline,
+    }
+
+    if mode == MERGE_MODE_CONFLICT_RESOLUTION:
+        lines, truncated, timed_out = _run_git_capped(
+            ["git", "diff-tree", "-r", "-c", "--no-commit-id", "--name-status", rev, *_merge_pathspec()],
+            max_files,
+            remaining(),
+        )
+        # Combined status has one letter per parent; keep the first-parent letter
+        first_parent_lines = []
+        for line in lines:
+            status, _, path = line.partition("\t")
+            first_parent_lines.append(f"{status[:1]}\t{path}")
+        changes = parse_name_status(first_parent_lines)
+        merge_info["truncated"] = truncated
+        merge_info["timed_out"] = timed_out
+    else:
+        changes = None
+        compare_parents = parents if mode == MERGE_MODE_PER_PARENT else parents[:1]
+        for parent in compare_parents:
+            if merge_info["timed_out"]:
+                break
+            lines, truncated, timed_out = _run_git_capped(
+                ["git", "diff", "--no-color", "--name-status", "-M", parent, rev, *_merge_pathspec()],
+                max_files,
+                remaining(),
+            )
+            parent_changes = parse_name_status(lines)
+            if changes is None:
+                changes = parent_changes
+            merge_info["parents"].append({
+                "sha": parent,
+                "counts": _count_changes(parent_changes),
+                "truncated": truncated,
+                "timed_out": timed_out,
+            })
+            merge_info["truncated"] = merge_info["truncated"] or truncated
+            merge_info["timed_out"] = merge_info["timed_out"] or timed_out
+        if changes is None:
+            changes = _empty_changes()
+
+    changes["merge"] = merge_info
+    return changes
+
+
+BUILTIN_IGNORE_PATTERNS = frozenset({
+    ".DS_Store",
+    "Thumbs.db",
+    ".DS_Store?",
+    ".DS_Store_?",
+    "Icon?",
+    ".Spotlight-V100",
+    ".Trashes",
+    "ehthumbs.db",
+    "Thumbs.db:encryptable",
+    ".fseventsd",
+    ".TemporaryItems",
+})
+TEMP_FILE_PATTERN = re.compile(r'^.*\.tmp$')
+
+
+def get_ignore_patterns():
+    """Return ``(names, regex)`` for the built-in plus configured ignore globs.
+
+    Extra glob patterns come from ``ignore_patterns`` in .flowji-ai/config.json.
+    Resolved once per run (see IGNORE_PATTERNS) so the per-path check never
+    touches the config or re-translates globs.
+    """
+    patterns = BUILTIN_IGNORE_PATTERNS.union(load_config()["ignore_patterns"])
+    regex = re.compile("|".join(fnmatch.translate(pattern) for pattern in sorted(patterns)))
+    return patterns, regex
+
+
+IGNORE_PATTERNS = get_ignore_patterns()
+
+
+def should_ignore_file(filepath, ignore_patterns=None):
+    """Check if a file should be ignored based on common ignore patterns.
+
+    ``ignore_patterns`` defaults to IGNORE_PATTERNS from ``get_ignore_patterns()``.
+    """
+    names, regex = ignore_patterns or IGNORE_PATTERNS
     filename = os.path.basename(filepath)
-    
+
     # Check exact matches
-    if filename in ignore_patterns:
+    if filename in names:
         return True
-    
+
     # Check for pattern matches
-    for pattern in ignore_patterns:
-        if fnmatch.fnmatch(filepath, pattern) or fnmatch.fnmatch(filename, pattern):
-            return True
-    
-    # Check for temporary/lock files
-    if re.match(r'^\.~.*\.tmp$', filename) or re.match(r'^.*\.tmp$', filename):
+    if regex.match(filepath) or regex.match(filename):
         return True
 
-    return False
+    # Check for temporary/lock files
+    return bool(TEMP_FILE_PATTERN.match(filename))
 
 
 def _is_summary_path(filepath):
@@ -342,11 +658,26 @@ def _is_summary_path(filepath):
     return normalized.lower().startswith(SUMMARY_SUBDIR_NORMALIZED.lower())
 
 
-def get_commit_stats():
-    """Get commit statistics using git show --stat --oneline."""
+def get_commit_stats(rev="HEAD", parents=None, summary_only=False):
+    """Get commit statistics using git show --stat --oneline.
+
+    Merge commits get a first-parent ``--shortstat`` bounded by the merge timeout
+    instead of git's default combined-diff stat. ``summary_only`` swaps the
+    per-file stat for ``--shortstat`` (used for rolled-up large commits).
+    """
+    if parents and len(parents) > 1:
+        _, _, timeout = get_merge_settings()
+        lines, _, timed_out = _run_git_capped(
+            ["git", "diff", "--shortstat", parents[0], rev, *_merge_pathspec()], 1, timeout
+        )
+        header = f"{rev[:7]} (merge; stats relative to first parent {parents[0][:7]})"
+        if timed_out:
+            return f"{header}\n(stats skipped: timed out after {timeout:g}s)"
+        return "\n".join([header, *lines])
+
     try:
         result = subprocess.run(
-            ["git", "show", "--stat", "--oneline", "HEAD"],
+            ["git", "show", "--shortstat" if summary_only else "--stat", "--oneline", rev],
             capture_output=True,
             text=True,
             check=True
@@ -357,6 +688,80 @@ def get_commit_stats():
         return ""
 
 
+def get_file_numstat(rev="HEAD", parents=None):
+    """Return ``{path: (insertions, deletions)}`` for a commit.
+
+    Binary files map to ``(None, None)``. Merge commits diff against the first
+    parent under the merge file cap and timeout.
+    """
+    if parents and len(parents) > 1:
+        _, max_files, timeout = get_merge_settings()
+        lines, _, _ = _run_git_capped(
+            ["git", "diff", "--numstat", "--no-renames", parents[0], rev, *_merge_pathspec()],
+            max_files,
+            timeout
+        )
+    else:
+        try:
+            lines = subprocess.run(
+                ["git", "diff-tree", "-r", "--numstat", "--no-renames", "--no-commit-id", "--root", rev],
+                capture_output=True,
+                text=True,
+                check=True
+            ).stdout.splitlines()
+        except subprocess.CalledProcessError as e:
+            print(f"[post-commit-summary] Error getting line counts: {e}")
+            return {}
+
+    numstat = {}
+    for line in lines:
+        parts = line.split("\t", 2)
+        if len(parts) != 3:
+            continue
+        added, deleted, path = parts
+        if added == "-":
+            numstat[path] = (None, None)
+        else:
+            numstat[path] = (int(added), int(deleted))
+    return numstat
+
+
+def get_symbol_settings():
+    """Return ``(max_blob_bytes, max_files)`` for PHP symbol extraction.
+
+    Set by ``symbol_max_bytes`` and ``symbol_max_files`` in .flowji-ai/config.json,
+    or GIT_SUMMARY_SYMBOL_MAX_BYTES and GIT_SUMMARY_SYMBOL_MAX_FILES; a max_files
+    of 0 disables the "Symbols Changed" section.
+    """
+    config = load_config()
+    return config["symbol_max_bytes"], config["symbol_max_files"]
+
+
+def get_symbol_changes(repo_root, rev, parents, merge_info=None):
+    """Return PHP symbol changes for the commit, or None when disabled or failing.
+
+    For merges, ``merge_info`` from ``get_merge_file_changes()`` supplies the
+    diff mode and the shared deadline: conflict-resolution reads the combined
+    diff, and the symbol diff only gets the time the file listing left over.
+    """
+    max_bytes, max_files = get_symbol_settings()
+    if max_files == 0:
+        return None
+    timeout = None
+    combined = False
+    if merge_info:
+        timeout = max(merge_info["deadline"] - time.monotonic(), 0.01)
+        combined = merge_info["mode"] == MERGE_MODE_CONFLICT_RESOLUTION
+    try:
+        return extract_symbol_changes(
+            repo_root, rev, parents, max_blob_bytes=max_bytes, max_files=max_files,
+            timeout=timeout, combined=combined
+        )
+    except (OSError, ValueError, subprocess.CalledProcessError) as e:
+        print(f"[post-commit-summary] Warning: Could not extract PHP symbols: {e}", file=sys.stderr)
+        return None
+
+
 def _parse_iso_timestamp(timestamp_str):
     """Return datetime from ISO string, tolerating trailing Z."""
     normalized = timestamp_str.replace('Z', '+00:00')
@@ -433,6 +838,176 @@ def _format_change_item(section_name: str, item: str) -> str:
     return f'- {value}'
 
 
+def _format_merge_details(merge_info):
+    """Return the "Merge Details" section lines for a merge summary."""
+    descriptions = {
+        MERGE_MODE_FIRST_PARENT: "files changed relative to the first parent",
+        MERGE_MODE_PER_PARENT: "files changed relative to the first parent; counts per parent below",
+        MERGE_MODE_CONFLICT_RESOLUTION: "only files that differ from every parent, i.e. merge resolutions",
+    }
+    lines = [
+        "## Merge Details",
+        "",
+        f"- Mode: {merge_info['mode']} ({descriptions.get(merge_info['mode'], '')})",
+    ]
+    for parent in merge_info["parents"]:
+        counts = parent["counts"]
+        total = sum(counts.values())
+        suffix = " (incomplete)" if parent["truncated"] or parent["timed_out"] else ""
+        lines.append(
+            f"- vs {parent['sha'][:7]}: {total} files{suffix} — "
+            f"{counts['created']} created, {counts['edited']} edited, "
+            f"{counts['deleted']} deleted, {counts['renamed']} renamed"
+        )
+    if merge_info["truncated"]:
+        lines.append(f"- Listing capped at {merge_info['max_files']} files")
+    if merge_info["timed_out"]:
+        lines.append(f"- Diff stopped after {merge_info['timeout']:g}s; listing is incomplete")
+    lines.append("")
+    return lines
+
+
+DEFAULT_ROLLUP_TOP_FILES = CONFIG_DEFAULTS["rollup_top_files"]
+ROLLUP_MAX_DEPTH = 3
+ROLLUP_MAX_CHILDREN = 10
+
+
+def get_rollup_settings():
+    """Return ``(threshold, top_files)`` for large-commit directory rollups.
+
+    Commits touching more than ``threshold`` files are summarised as a directory
+    tree plus the ``top_files`` hottest paths. Set by ``rollup_threshold`` (``0``
+    disables rollups) and ``rollup_top_files`` in .flowji-ai/config.json, or
+    GIT_SUMMARY_ROLLUP_THRESHOLD and GIT_SUMMARY_ROLLUP_TOP.
+    """
+    config = load_config()
+    return config["rollup_threshold"], config["rollup_top_files"]
+
+
+def count_changed_files(file_changes):
+    """Return the number of paths listed across all change categories."""
+    return sum(len(file_changes.get(key, [])) for key in ("created", "edited", "deleted", "renamed", "other"))
+
+
+def should_roll_up(file_changes):
+    """Return True if the commit is large enough to summarise by directory."""
+    threshold, _ = get_rollup_settings()
+    return threshold > 0 and count_changed_files(file_changes) > threshold
+
+
+def _iter_change_paths(file_changes):
+    """Yield ``(section_name, item, path)`` for every listed change."""
+    for section_name, key in (("Files Created", "created"), ("Files Edited", "edited"), ("Files Deleted", "deleted")):
+        for path in file_changes.get(key, []):
+            yield section_name, path, path
+    for old, new in file_changes.get("renamed", []):
+        yield "Other Changes", f"renamed: {old} -> {new}", new
+    for item in file_changes.get("other", []):
+        yield "Other Changes", item, item.split(": ", 1)[-1]
+
+
+def build_directory_rollup(file_changes, numstat=None, top_files=DEFAULT_ROLLUP_TOP_FILES):
+    """Aggregate changes into a directory tree in one pass over the change list.
+
+    Every node carries ``files``, ``insertions`` and ``deletions`` for its whole
+    subtree (binary files count as files only). Also returns the ``top_files``
+    hottest changes by insertions plus deletions, as ``(section_name, item, added, deleted)``.
+    """
+    numstat = numstat or {}
+    root = {"files": 0, "insertions": 0, "deletions": 0, "children": {}}
+    hottest = []
+
+    for section_name, item, path in _iter_change_paths(file_changes):
+        added, deleted = numstat.get(path, (None, None))
+        added, deleted = added or 0, deleted or 0
+        hottest.append((section_name, item, added, deleted))
+
+        node = root
+        node["files"] += 1
+        node["insertions"] += added
+        node["deletions"] += deleted
+        for part in path.replace("\\", "/").strip("/").split("/")[:-1][:ROLLUP_MAX_DEPTH]:
+            node = node["children"].setdefault(
+                part, {"files": 0, "insertions": 0, "deletions": 0, "children": {}}
+            )
+            node["files"] += 1
+            node["insertions"] += added
+            node["deletions"] += deleted
+
+    hottest.sort(key=lambda entry: -(entry[2] + entry[3]))
+    return root, hottest[:top_files]
+
+
+def _format_rollup_node(name, node):
+    plural = "file" if node["files"] == 1 else "files"
+    return f"`{name}/` — {node['files']} {plural}, +{node['insertions']}/-{node['deletions']}"
+
+
+def _format_directory_rollup(root, depth=0, prefix=""):
+    """Return nested list lines for a rollup tree, busiest directories first."""
+    lines = []
+    children = sorted(
+        root["children"].items(),
+        key=lambda item: (-(item[1]["insertions"] + item[1]["deletions"]), -item[1]["files"], item[0]),
+    )
+    indent = "  " * depth
+    for name, node in children[:ROLLUP_MAX_CHILDREN]:
+        path = f"{prefix}{name}"
+        lines.append(f"{indent}- {_format_rollup_node(path, node)}")
+        lines.extend(_format_directory_rollup(node, depth + 1, f"{path}/"))
+    if len(children) > ROLLUP_MAX_CHILDREN:
+        rest = children[ROLLUP_MAX_CHILDREN:]
+        lines.append(
+            f"{indent}- ... and {len(rest)} more directories "
+            f"({sum(node['files'] for _, node in rest)} files)"
+        )
+    return lines
+
+
+def _format_rollup_sections(file_changes, numstat):
+    """Return lines for a rolled-up large commit: directory tree plus hottest files."""
+    _, top_files = get_rollup_settings()
+    root, hottest = build_directory_rollup(file_changes, numstat, top_files)
+    top_level = root["files"] - sum(child["files"] for child in root["children"].values())
+
+    lines = [
+        "## Directory Rollup",
+        "",
+        f"{root['files']} files changed, +{root['insertions']}/-{root['deletions']} "
+        f"(created {len(file_changes.get('created', []))}, edited {len(file_changes.get('edited', []))}, "
+        f"deleted {len(file_changes.get('deleted', []))}, other {len(file_changes.get('renamed', [])) + len(file_changes.get('other', []))})",
+        "",
+    ]
+    lines.extend(_format_directory_rollup(root))
+    if top_level:
+        plural = "file" if top_level == 1 else "files"
+        lines.append(f"- `./` — {top_level} top-level {plural}")
+    lines.append("")
+
+    # Per-file sections list only the hottest paths
+    listed = {}
+    for section_name, item, added, deleted in hottest:
+        listed.setdefault(section_name, []).append((item, added, deleted))
+    totals = {
+        "Files Created": len(file_changes.get("created", [])),
+        "Files Edited": len(file_changes.get("edited", [])),
+        "Files Deleted": len(file_changes.get("deleted", [])),
+        "Other Changes": len(file_changes.get("renamed", [])) + len(file_changes.get("other", [])),
+    }
+    for section_name, total in totals.items():
+        items = listed.get(section_name, [])
+        lines.append(f"## {section_name}")
+        lines.append("")
+        for item, added, deleted in items:
+            lines.append(f"{_format_change_item(section_name, item)} (+{added}/-{deleted})")
+        if total > len(items):
+            lines.append(f"- ... and {total - len(items)} more (see Directory Rollup)")
+        if not total:
+            lines.append("(none)")
+        lines.append("")
+    return lines
+
+
 def ensure_output_directory(repo_root):
     """Ensure the summaries directory exists."""
     output_dir = Path(repo_root) / SUMMARY_SUBDIR
@@ -440,25 +1015,20 @@ def ensure_output_directory(repo_root):
     return output_dir
 
 
-def write_markdown_summary(repo_root, commit_info, file_changes, stats):
-    """Write the structured Markdown summary file."""
+def write_markdown_summary(repo_root, commit_info, file_changes, stats, symbols=None, numstat=None):
+    """Write the structured Markdown summary file.
+
+    ``symbols`` (from ``get_symbol_changes``) adds a "Symbols Changed" section,
+    annotated with per-file line counts from ``numstat`` when given. Commits
+    over the rollup threshold get a "Directory Rollup" section and list only
+    their hottest files.
+    """
     output_dir = ensure_output_directory(repo_root)
 
     timestamp_str = commit_info["timestamp"]
     timestamp_for_filename = format_filename_timestamp(timestamp_str)
     header_timestamp = format_header_timestamp(timestamp_str)
 
-    filename = f"{timestamp_for_filename}.md"
-    filepath = output_dir / filename
-
-    # Handle filename collisions by adding numeric suffix
-    counter = 1
-    while filepath.exists():
-        name_part = timestamp_for_filename
-        suffix = f"_{counter}.md"
-        filepath = output_dir / f"{name_part}{suffix}"
-        counter += 1
-
     subject_full = commit_info["subject"].strip() if commit_info["subject"] else ""
     if not subject_full:
         subject_full = "(no subject)"
@@ -514,27 +1084,37 @@ def write_markdown_summary(repo_root, commit_info, file_changes, stats):
         ""
     ]
 
-    other_entries = [
-        f"renamed: {old} -> {new}" for old, new in file_changes.get("renamed", [])
-    ]
-    other_entries.extend(file_changes.get("other", []))
-
-    sections = [
-        ("Files Created", file_changes.get("created", [])),
-        ("Files Edited", file_changes.get("edited", [])),
-        ("Files Deleted", file_changes.get("deleted", [])),
-        ("Other Changes", other_entries),
-    ]
-
-    for section_name, items in sections:
-        lines.append(f"## {section_name}")
-        lines.append("")
-        if items:
-            for item in items:
-                lines.append(_format_change_item(section_name, item))
-        else:
-            lines.append("(none)")
-        lines.append("")
+    merge_info = file_changes.get("merge")
+    if merge_info:
+        lines.extend(_format_merge_details(merge_info))
+
+    if should_roll_up(file_changes):
+        lines.extend(_format_rollup_sections(file_changes, numstat))
+    else:
+        other_entries = [
+            f"renamed: {old} -> {new}" for old, new in file_changes.get("renamed", [])
+        ]
+        other_entries.extend(file_changes.get("other", []))
+
+        sections = [
+            ("Files Created", file_changes.get("created", [])),
+            ("Files Edited", file_changes.get("edited", [])),
+            ("Files Deleted", file_changes.get("deleted", [])),
+            ("Other Changes", other_entries),
+        ]
+
+        for section_name, items in sections:
+            lines.append(f"## {section_name}")
+            lines.append("")
+            if items:
+                for item in items:
+                    lines.append(_format_change_item(section_name, item))
+            else:
+                lines.append("(none)")
+            lines.append("")
+
+    if symbols and symbols["files"]:
+        lines.extend(format_symbols_section(symbols, numstat))
 
     if stats:
         lines.append("## Stats")
@@ -544,19 +1124,64 @@ def write_markdown_summary(repo_root, commit_info, file_changes, stats):
         lines.append("```")
         lines.append("")
 
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines).rstrip() + "\n")
-
-    return filepath
+    content = "\n".join(lines).rstrip() + "\n"
+    return _publish_summary(output_dir, timestamp_for_filename, content)
 
 
-def apply_retention_policy(output_dir, days=180):
-    """Remove summary files older than the specified number of days.
+def _publish_summary(output_dir, name_part, content):
+    """Write content to a temp file, then claim the first free summary name.
 
-    Only removes files matching the git summary naming pattern (YYYY-MM-DD--HHMMSSZ.md)
-    to avoid deleting other markdown files or files in subdirectories.
+    The name is claimed with an exclusive hard link (or an O_EXCL placeholder
+    where hard links are unsupported), so concurrent writers in the same second
+    get distinct ``_N`` suffixes and never overwrite each other.
     """
-    import time
+    fd, tmp_name = tempfile.mkstemp(dir=output_dir, prefix=f".{name_part}.", suffix=".tmp")
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+
+        counter = 0
+        while True:
+            suffix = f"_{counter}" if counter else ""
+            filepath = output_dir / f"{name_part}{suffix}.md"
+            counter += 1
+            try:
+                os.link(tmp_path, filepath)
+                return filepath
+            except FileExistsError:
+                continue
+            except OSError:
+                pass
+
+            # Hard links unavailable: reserve the name exclusively, then replace it
+            try:
+                os.close(os.open(filepath, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+            except FileExistsError:
+                continue
+            os.replace(tmp_path, filepath)
+            return filepath
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def apply_retention_policy(output_dir, days=180, archive=True):
+    """Archive and remove summary files older than the specified number of days.
+
+    Only processes files matching the git summary naming pattern (YYYY-MM-DD--HHMMSSZ.md)
+    to avoid touching other markdown files or files in subdirectories. When ``archive``
+    is enabled, expired summaries are folded into their month's pack in ``archive/``
+    (rebuilt under a new content-hash name so branches never edit the same pack)
+    before removal so they stay readable by SHA.
+
+    Returns ``(touched_paths, removed_paths)`` so the caller can stage the changes.
+    A ``days`` value of 0 keeps summaries forever.
+    """
+    if days <= 0:
+        return [], []
 
     current_time = time.time()
     cutoff_time = current_time - (days * 24 * 60 * 60)  # Convert days to seconds
@@ -564,7 +1189,11 @@ def apply_retention_policy(output_dir, days=180):
     # Pattern matches: YYYY-MM-DD--HHMMSSZ.md (optionally with _N suffix for duplicates)
     summary_pattern = re.compile(r'^\d{4}-\d{2}-\d{2}--\d{6}Z(_\d+)?\.md$')
 
-    for file_path in output_dir.glob("*.md"):
+    touched = []
+    removed = []
+    expired = []
+
+    for file_path in sorted(output_dir.glob("*.md")):
         # Only process files in the output_dir itself, not subdirectories
         if file_path.parent != output_dir:
             continue
@@ -577,67 +1206,374 @@ def apply_retention_policy(output_dir, days=180):
 
         # Check if file is older than cutoff
         if file_mod_time < cutoff_time:
-            try:
-                file_path.unlink()
-                print(f"[post-commit-summary] Removed old summary: {file_path.name}")
-            except OSError as e:
-                print(f"[post-commit-summary] Warning: Could not remove old file {file_path}: {e}")
+            expired.append(file_path)
+
+    if expired and archive:
+        try:
+            touched, removed, expired = archive_summaries(output_dir, expired)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[post-commit-summary] Warning: Could not archive old summaries, keeping them: {e}")
+            return [], []
+
+    for file_path in expired:
+        try:
+            file_path.unlink()
+            removed.append(file_path)
+            action = "Archived" if archive else "Removed"
+            print(f"[post-commit-summary] {action} old summary: {file_path.name}")
+        except OSError as e:
+            print(f"[post-commit-summary] Warning: Could not remove old file {file_path}: {e}")
+
+    return sorted(touched), removed
+
+
+GIT_LOCK_RETRIES = 10
+
 
+HOOK_METRICS_FILENAME = "hook-metrics.json"
+HOOK_METRICS_KEEP = 50
 
-def main():
-    """Main execution function."""
+
+def record_hook_metrics(duration, commit_info):
+    """Keep the last few hook run durations for fleet health reporting.
+
+    Stored next to the commit lock in the shared git directory; failures are
+    ignored because metrics must never affect the commit flow.
+    """
     try:
+        metrics_path = find_git_common_dir() / "flowji-ai" / HOOK_METRICS_FILENAME
+        try:
+            with open(metrics_path, "r", encoding="utf-8") as f:
+                runs = json.load(f).get("runs", [])
+        except (OSError, ValueError):
+            runs = []
+        runs.append({
+            "sha": commit_info["sha_short"],
+            "finished": datetime.now().astimezone().isoformat(timespec="seconds"),
+            "seconds": round(duration, 3),
+        })
+        tmp_path = metrics_path.with_name(f"{metrics_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"runs": runs[-HOOK_METRICS_KEEP:]}, f)
+        os.replace(tmp_path, metrics_path)
+    except (OSError, subprocess.CalledProcessError):
+        pass
+
+
+def _run_git_retrying(args):
+    """Run a git command, retrying while another process holds index.lock."""
+    for attempt in range(GIT_LOCK_RETRIES):
+        try:
+            return subprocess.run(args, check=True, capture_output=True, text=True)
+        except subprocess.CalledProcessError as e:
+            if "index.lock" not in (e.stderr or "") or attempt == GIT_LOCK_RETRIES - 1:
+                raise
+            time.sleep(0.1 * (attempt + 1))
+
+
+def commit_summary_files(commit_info, output_path, added_paths, removed_paths, message=None):
+    """Stage and commit only the summary-owned paths.
+
+    The commit is limited to these paths so anything else a user or a parallel
+    process has staged in the meantime is left untouched. Call this while
+    holding ``summary_commit_lock()``.
+    """
+    _run_git_retrying(["git", "add", "--", str(output_path), *map(str, added_paths)])
+    commit_paths = [str(output_path), *map(str, added_paths)]
+    if removed_paths:
+        result = _run_git_retrying(
+            ["git", "rm", "--cached", "--ignore-unmatch", "--", *map(str, removed_paths)]
+        )
+        # git prints "rm '<path>'" for each tracked path it removed
+        commit_paths.extend(
+            line[4:-1] for line in result.stdout.splitlines() if line.startswith("rm '")
+        )
+    _run_git_retrying(
+        [
+            "git",
+            "commit",
+            "-m",
+            message or f"[git-summary] Add commit summary for {commit_info['sha_short']}",
+            "--",
+            *commit_paths,
+        ]
+    )
+
+
+PENDING_FILENAME = "pending-summaries.json"
+
+
+def _pending_path(repo_root):
+    git_dir = find_git_dir(repo_root)
+    if git_dir is None:
+        raise OSError("could not locate the git directory")
+    return git_dir / "flowji-ai" / PENDING_FILENAME
+
+
+def _load_pending(pending_path):
+    try:
+        with open(pending_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"summaries": [], "added": [], "removed": []}
+
+
+def _save_pending(pending_path, pending):
+    pending_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = pending_path.with_name(f"{pending_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(pending, f, indent=2)
+    os.replace(tmp_path, pending_path)
+
+
+def queue_summary_files(repo_root, commit_info, output_path, added_paths, removed_paths):
+    """Record summary-owned paths for a later batched auto-commit.
+
+    Call this while holding ``summary_commit_lock()``. Returns the number of
+    summaries now pending.
+    """
+    root = Path(repo_root)
+    pending_path = _pending_path(repo_root)
+    pending = _load_pending(pending_path)
+    pending["summaries"].append({
+        "sha_short": commit_info["sha_short"],
+        "path": str(Path(output_path).relative_to(root)),
+    })
+    pending["added"].extend(str(Path(path).relative_to(root)) for path in added_paths)
+    pending["removed"].extend(str(Path(path).relative_to(root)) for path in removed_paths)
+    _save_pending(pending_path, pending)
+    return len(pending["summaries"])
+
+
+def flush_pending_summaries(repo_root):
+    """Commit every queued summary in one ``[git-summary]`` commit.
+
+    Call this while holding ``summary_commit_lock()``. Returns the number of
+    summaries committed.
+    """
+    root = Path(repo_root)
+    pending_path = _pending_path(repo_root)
+    pending = _load_pending(pending_path)
+    summaries = [entry for entry in pending["summaries"] if (root / entry["path"]).exists()]
+    if not summaries:
+        pending_path.unlink(missing_ok=True)
+        return 0
+
+    shas = [entry["sha_short"] for entry in summaries]
+    label = ", ".join(shas) if len(shas) <= 5 else f"{len(shas)} commits ({shas[0]}..{shas[-1]})"
+    other_paths = [root / entry["path"] for entry in summaries[1:]]
+    other_paths.extend(root / path for path in dict.fromkeys(pending["added"]) if (root / path).exists())
+    commit_summary_files(
+        None,
+        root / summaries[0]["path"],
+        other_paths,
+        [root / path for path in dict.fromkeys(pending["removed"])],
+        message=f"[git-summary] Add commit summaries for {label}",
+    )
+    pending_path.unlink(missing_ok=True)
+    return len(summaries)
+
+
+MERGE_STATE_WAIT = 10.0
+
+
+def spawn_async_summary(repo_root, rev):
+    """Generate the summary for ``rev`` in a detached background process."""
+    git_dir = find_git_dir(repo_root)
+    log_path = git_dir / "flowji-ai" / "async-summary.log"
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_path, "a", encoding="utf-8") as log:
+        subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), "--rev", rev],
+            cwd=repo_root,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True
+        )
+    return log_path
+
+
+def wait_for_merge_state(repo_root, timeout=MERGE_STATE_WAIT):
+    """Wait until git clears MERGE_HEAD; returns False if it is still there.
+
+    The post-merge hook runs before ``git merge`` removes its merge state, and
+    git refuses the summary's path-limited commit while it is present.
+    """
+    merge_head = find_git_dir(repo_root) / "MERGE_HEAD"
+    deadline = time.monotonic() + timeout
+    while merge_head.exists():
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.1)
+    return True
+
+
+def run_flush():
+    """CLI helper: commit queued summaries now."""
+    repo_root = require_repo_root("post-commit-summary")
+    try:
+        with summary_commit_lock():
+            count = flush_pending_summaries(repo_root)
+    except (TimeoutError, OSError, subprocess.CalledProcessError) as e:
+        print(f"[post-commit-summary] Error: Could not flush pending summaries: {e}", file=sys.stderr)
+        return 1
+    print(f"[post-commit-summary] committed {count} pending summar{'y' if count == 1 else 'ies'}")
+    return 0
+
+
+def get_post_merge_rev():
+    """Return HEAD if the merge that just ran created it as a merge commit.
+
+    ``post-merge`` also fires for fast-forwards and squash merges. Only a merge
+    commit whose first parent is ORIG_HEAD was made here; a fast-forward onto
+    someone else's merge brings that merge's summary along with it.
+    """
+    result = subprocess.run(
+        ["git", "rev-list", "--parents", "-n", "1", "HEAD"],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    head, *parents = result.stdout.split()
+    orig_head = subprocess.run(
+        ["git", "rev-parse", "--verify", "--quiet", "ORIG_HEAD"],
+        capture_output=True,
+        text=True
+    ).stdout.strip()
+    if len(parents) < 2 or parents[0] != orig_head:
+        return None
+    return head
+
+
+def run_post_merge():
+    """CLI helper: summarize the merge commit a clean ``git merge`` created.
+
+    A merge that needs no conflict resolution commits without running the
+    post-commit hook, so the post-merge hook calls this instead. Merges that
+    already have a summary (one concluded with ``git commit``) are skipped.
+    Merges need no message validation, so the whole summary runs detached.
+    """
+    try:
+        rev = get_post_merge_rev()
+        if rev is None:
+            return 0
+        repo_root = require_repo_root("post-commit-summary")
+        output_dir = Path(repo_root) / load_config(repo_root)["summary_dir"]
+        index = load_refreshed_index(repo_root, output_dir)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"[post-commit-summary] Warning: Could not inspect merge: {e}", file=sys.stderr)
+        return 0
+    if any(entry.get("sha") == rev for entry in index["entries"].values()):
+        return 0
+    # git still holds the merge state until this hook returns, so the summary
+    # is generated and committed by a detached process that waits it out
+    log_path = spawn_async_summary(repo_root, rev)
+    print(f"[post-commit-summary] summarizing merge {rev[:7]} in the background (log: {log_path})")
+    return 0
+
+
+def main(rev=None):
+    """Main execution function.
+
+    ``rev`` is set when running as the detached half of async mode; the commit
+    has already been validated by the hook process that spawned us.
+    """
+    started = time.monotonic()
+    try:
+        detached = rev is not None
+
+        # Resolve HEAD once; later commits must not change which commit we describe
+        rev = rev or get_head_sha()
+
         # Check if we're in a recursive hook call (committing the summary itself)
-        current_subject = get_latest_commit_subject()
+        current_subject = get_latest_commit_subject(rev)
 
         if current_subject.startswith("[git-summary]"):
             print("[post-commit-summary] Skipping summary generation for git-summary commit")
             return
 
-        if not validate_latest_commit(current_subject):
+        if not detached and not validate_latest_commit(current_subject, rev=rev):
             # Validation failed; exit successfully so commit flow continues.
             return
 
         # Get repository root
-        repo_root = get_git_repo_root()
+        repo_root = require_repo_root("post-commit-summary")
+        config = load_config(repo_root)
+
+        if detached and not wait_for_merge_state(repo_root):
+            print("[post-commit-summary] Warning: merge still in progress; the auto-commit may fail", file=sys.stderr)
+
+        # Async mode: validation above stays in the foreground, the rest is detached
+        if config["async"] and not detached:
+            log_path = spawn_async_summary(repo_root, rev)
+            print(f"[post-commit-summary] generating summary in the background (log: {log_path})")
+            return
 
         # Get commit information
-        commit_info = get_commit_info()
+        commit_info = get_commit_info(rev)
 
         # Get file changes
-        file_changes = get_file_changes()
+        file_changes = get_file_changes(rev, commit_info["parents"])
 
-        # Get commit stats
-        stats = get_commit_stats()
+        # Get commit stats (totals only when the file list will be rolled up)
+        stats = get_commit_stats(rev, commit_info["parents"], summary_only=should_roll_up(file_changes))
 
-        # Write markdown summary
-        output_path = write_markdown_summary(repo_root, commit_info, file_changes, stats)
+        # Per-file line counts and changed PHP classes, functions and hooks
+        numstat = get_file_numstat(rev, commit_info["parents"])
+        symbols = get_symbol_changes(repo_root, rev, commit_info["parents"], file_changes.get("merge"))
 
-        # Apply retention policy to remove old files
-        output_dir = ensure_output_directory(repo_root)
-        apply_retention_policy(output_dir, days=180)
+        # Write markdown summary (atomic, never overwrites a concurrent writer's file)
+        output_path = write_markdown_summary(
+            repo_root, commit_info, file_changes, stats, symbols=symbols, numstat=numstat
+        )
 
         # Print confirmation message
         relative_path = output_path.relative_to(Path(repo_root))
         print(f"[post-commit-summary] wrote {relative_path}")
 
-        # Auto-commit the summary file so it's tracked
-        # This prevents issues with tools like GitHub Copilot that scan for untracked files
+        # Retention, rollups and the auto-commit read and rewrite shared files,
+        # so parallel hook runs (worktrees, scripted commits) take turns here
         try:
-            subprocess.run(
-                ["git", "add", str(output_path)],
-                check=True,
-                capture_output=True
-            )
-            subprocess.run(
-                ["git", "commit", "-m", f"[git-summary] Add commit summary for {commit_info['sha_short']}"],
-                check=True,
-                capture_output=True
-            )
-            print(f"[post-commit-summary] auto-committed {relative_path}")
-        except subprocess.CalledProcessError as e:
-            # Non-fatal - summary was created, just not auto-committed
-            print(f"[post-commit-summary] Warning: Could not auto-commit summary: {e}", file=sys.stderr)
+            with summary_commit_lock():
+                # Apply retention policy to archive and remove old files
+                output_dir = ensure_output_directory(repo_root)
+                archived_paths, removed_paths = apply_retention_policy(
+                    output_dir, days=config["retention_days"], archive=config["archive_expired"]
+                )
+
+                # Fold the commit into the current (local, untracked) daily and weekly digests
+                try:
+                    update_rollups(repo_root, output_dir, [record_from_commit(commit_info, file_changes)])
+                except (OSError, ValueError) as e:
+                    print(f"[post-commit-summary] Warning: Could not update rollups: {e}", file=sys.stderr)
+
+                # Auto-commit the summary file so it's tracked
+                # This prevents issues with tools like GitHub Copilot that scan for untracked files
+                batch_size = config["batch_size"]
+                try:
+                    if batch_size == 1:
+                        commit_summary_files(
+                            commit_info, output_path, archived_paths, removed_paths
+                        )
+                        print(f"[post-commit-summary] auto-committed {relative_path}")
+                    else:
+                        # Batch mode: one [git-summary] commit per batch_size summaries (0: never)
+                        queued = queue_summary_files(
+                            repo_root, commit_info, output_path, archived_paths, removed_paths
+                        )
+                        if batch_size and queued >= batch_size:
+                            count = flush_pending_summaries(repo_root)
+                            print(f"[post-commit-summary] auto-committed {count} batched summaries")
+                        else:
+                            print(f"[post-commit-summary] queued {relative_path} ({queued} pending)")
+                except (subprocess.CalledProcessError, OSError) as e:
+                    # Non-fatal - summary was created, just not auto-committed
+                    print(f"[post-commit-summary] Warning: Could not auto-commit summary: {e}", file=sys.stderr)
+
+                record_hook_metrics(time.monotonic() - started, commit_info)
+        except TimeoutError as e:
+            print(f"[post-commit-summary] Warning: Skipped retention and auto-commit: {e}", file=sys.stderr)
 
     except Exception as e:
         print(f"[post-commit-summary] Error: {e}", file=sys.stderr)
@@ -653,6 +1589,32 @@ def parse_args():
         action="store_true",
         help="Run escaped newline validation for the latest commit and exit.",
     )
+    parser.add_argument(
+        "--validate-range",
+        metavar="RANGE",
+        help="Validate every commit in RANGE (e.g. origin/main..HEAD) from a single git log stream and exit.",
+    )
+    parser.add_argument(
+        "--flush",
+        action="store_true",
+        help="Commit summaries queued by batch mode (batch_size in .flowji-ai/config.json) and exit.",
+    )
+    parser.add_argument(
+        "--rev",
+        metavar="SHA",
+        help="Describe SHA instead of HEAD without re-validating it (used by async mode).",
+    )
+    parser.add_argument(
+        "--post-merge",
+        action="store_true",
+        help="Summarize HEAD if the merge that just ran created a merge commit (used by the post-merge hook).",
+    )
+    parser.add_argument(
+        "--pre-push",
+        nargs="+",
+        metavar="REMOTE",
+        help="Validate pushed commits read from stdin (used by the pre-push hook) and exit.",
+    )
     return parser.parse_args()
 
 
@@ -681,4 +1643,12 @@ if __name__ == "__main__":
     args = parse_args()
     if args.validate_only:
         sys.exit(run_validation_only())
-    main()
+    if args.validate_range:
+        sys.exit(run_validate_range([args.validate_range]))
+    if args.pre_push:
+        sys.exit(run_pre_push(args.pre_push[0]))
+    if args.flush:
+        sys.exit(run_flush())
+    if args.post_merge:
+        sys.exit(run_post_merge())
+    main(args.rev)
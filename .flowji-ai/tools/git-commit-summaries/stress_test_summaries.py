@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Concurrent Summary Stress Test
+
+Verifies that no commit summary is lost or overwritten under concurrency. Runs
+in a throwaway repository and never touches the current one.
+
+Phase 1 (writers): many processes publish summaries with the same timestamp
+into one directory at once; every summary must land in its own intact file.
+
+Phase 2 (commits): commits are fired concurrently from several worktrees with
+the hooks installed and all commit dates pinned to the same second; every
+commit must end up with exactly one committed summary on its branch.
+
+Usage:
+    python3 stress_test_summaries.py
+    python3 stress_test_summaries.py --writers 500 --commits 300 --worktrees 12
+"""
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import post_commit_summary
+from summary_index import is_summary_filename
+
+
+PINNED_DATE = "2025-06-01T12:00:00+00:00"
+SUMMARY_SUBDIR = ".flowji-ai/memory/git-summaries"
+SHA_LINE_PATTERN = re.compile(r'^SHA:\s*([0-9a-f]+)\s*$', re.MULTILINE)
+
+
+def _git(args, cwd, env=None):
+    return subprocess.run(
+        ["git", *args],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+
+def _summary_shas(summary_dir):
+    """Return a list of SHAs recorded in summary files (duplicates kept)."""
+    shas = []
+    for entry in os.scandir(summary_dir):
+        if entry.is_file() and is_summary_filename(entry.name):
+            with open(entry.path, "r", encoding="utf-8") as f:
+                match = SHA_LINE_PATTERN.search(f.read())
+            shas.append(match.group(1) if match else None)
+    return shas
+
+
+def _write_one(args):
+    """Worker for phase 1: publish one summary with a shared timestamp."""
+    output_root, number = args
+    sha = f"{number:040x}"
+    commit_info = {
+        "sha_full": sha,
+        "sha_short": sha[:7],
+        "author_name": "Stress Test",
+        "author_email": "stress@example.invalid",
+        "timestamp": PINNED_DATE,
+        "subject": f"Stress commit {number}",
+        "full_message": "",
+        "branch": "stress",
+        "parents": [],
+    }
+    changes = {"created": [f"file-{number}.txt"], "edited": [], "deleted": [], "renamed": [], "other": []}
+    path = post_commit_summary.write_markdown_summary(output_root, commit_info, changes, "")
+    return str(path)
+
+
+def run_writer_phase(count, jobs):
+    """Publish ``count`` summaries concurrently; returns a list of problems."""
+    problems = []
+    with tempfile.TemporaryDirectory(prefix="flowji-stress-writers-") as tmp:
+        started = time.monotonic()
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            paths = list(pool.map(_write_one, [(tmp, n) for n in range(count)]))
+        elapsed = time.monotonic() - started
+
+        if len(set(paths)) != count:
+            problems.append(f"writers: {count - len(set(paths))} writers reported the same path")
+
+        summary_dir = Path(tmp) / post_commit_summary.SUMMARY_SUBDIR
+        shas = _summary_shas(summary_dir)
+        expected = {f"{n:040x}" for n in range(count)}
+        missing = expected - set(shas)
+        if missing:
+            problems.append(f"writers: {len(missing)} summaries lost")
+        if len(shas) != len(set(shas)) or None in shas:
+            problems.append("writers: duplicate or truncated summary files found")
+        leftovers = [name for name in os.listdir(summary_dir) if name.endswith(".tmp")]
+        if leftovers:
+            problems.append(f"writers: {len(leftovers)} temp files left behind")
+
+    print(f"  writers: {count} summaries in {elapsed:.2f}s, {len(problems)} problem(s)")
+    return problems
+
+
+def _setup_repo(root, worktrees):
+    """Create a repository with the toolkit and hooks plus N worktrees."""
+    repo = root / "repo"
+    repo.mkdir()
+    _git(["init", "-q"], repo)
+    _git(["config", "user.name", "Stress Test"], repo)
+    _git(["config", "user.email", "stress@example.invalid"], repo)
+
+    toolkit_src = Path(__file__).resolve().parent
+    toolkit_dst = repo / ".flowji-ai/tools/git-commit-summaries"
+    shutil.copytree(toolkit_src, toolkit_dst, ignore=shutil.ignore_patterns("__pycache__"))
+    subprocess.run(
+        ["bash", str(toolkit_dst / "install_post_commit_hook.sh")],
+        cwd=repo,
+        capture_output=True,
+        check=True
+    )
+    _git(["add", "-A"], repo)
+    _git(["commit", "-q", "-m", "Stress test base"], repo)
+    base = _git(["rev-parse", "HEAD"], repo).stdout.strip()
+
+    paths = []
+    for number in range(worktrees):
+        path = root / f"wt-{number}"
+        _git(["worktree", "add", "-q", "-b", f"stress-{number}", str(path)], repo)
+        paths.append(path)
+    return repo, base, paths
+
+
+def _commit_many(worktree, count, env):
+    """Worker for phase 2: make ``count`` commits in one worktree."""
+    failures = 0
+    for number in range(count):
+        target = worktree / "stress" / f"{number}.txt"
+        target.parent.mkdir(exist_ok=True)
+        target.write_text(f"{worktree.name} {number}\n", encoding="utf-8")
+        try:
+            _git(["add", str(target)], worktree, env)
+            _git(["commit", "-q", "-m", f"Stress {worktree.name} #{number}"], worktree, env)
+        except subprocess.CalledProcessError:
+            failures += 1
+    return failures
+
+
+def run_commit_phase(commits, worktrees):
+    """Fire commits concurrently across worktrees; returns a list of problems."""
+    problems = []
+    with tempfile.TemporaryDirectory(prefix="flowji-stress-commits-") as tmp:
+        repo, base, paths = _setup_repo(Path(tmp), worktrees)
+
+        env = dict(os.environ, GIT_AUTHOR_DATE=PINNED_DATE, GIT_COMMITTER_DATE=PINNED_DATE)
+        env.pop("GIT_SUMMARY_DIR", None)
+        per_worktree = [commits // worktrees + (1 if n < commits % worktrees else 0) for n in range(worktrees)]
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=worktrees) as pool:
+            failures = sum(pool.map(lambda item: _commit_many(item[0], item[1], env), zip(paths, per_worktree)))
+        elapsed = time.monotonic() - started
+        if failures:
+            problems.append(f"commits: {failures} commits failed")
+
+        for path in paths:
+            log = _git(["log", "--format=%H%x1f%s", f"{base}..HEAD"], path).stdout.splitlines()
+            user_shas = {line.split("\x1f", 1)[0] for line in log if "\x1f[git-summary]" not in line}
+            recorded = [sha for sha in _summary_shas(path / SUMMARY_SUBDIR) if sha in user_shas]
+            if set(recorded) != user_shas:
+                problems.append(f"commits: {path.name} is missing {len(user_shas - set(recorded))} summaries")
+            if len(recorded) != len(set(recorded)):
+                problems.append(f"commits: {path.name} has duplicate summaries")
+            dirty = _git(["status", "--porcelain", "--", SUMMARY_SUBDIR], path).stdout.strip()
+            if dirty:
+                problems.append(f"commits: {path.name} has uncommitted summary files")
+
+    print(
+        f"  commits: {commits} commits across {worktrees} worktrees in {elapsed:.2f}s, "
+        f"{len(problems)} problem(s)"
+    )
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Stress-test concurrent summary writes and auto-commits in a throwaway repo."
+    )
+    parser.add_argument("--writers", type=int, default=200, help="Concurrent summary writers (default: 200).")
+    parser.add_argument("--jobs", type=int, default=32, help="Writer processes (default: 32).")
+    parser.add_argument("--commits", type=int, default=200, help="Total commits to fire (default: 200).")
+    parser.add_argument("--worktrees", type=int, default=8, help="Worktrees committing in parallel (default: 8).")
+    args = parser.parse_args()
+
+    print("Running concurrent summary stress test...")
+    problems = []
+    if args.writers > 0:
+        problems.extend(run_writer_phase(args.writers, max(args.jobs, 1)))
+    if args.commits > 0:
+        problems.extend(run_commit_phase(args.commits, max(args.worktrees, 1)))
+
+    if problems:
+        for problem in problems:
+            print(f"❌ {problem}")
+        return 1
+    print("✓ No summaries lost")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Summary Archive Packs
+
+Rolls expired commit summaries into compressed packs under
+``<summaries>/archive/``. Each pack is a concatenation of independent gzip
+members with a JSON offset index beside it, so a single summary can be read
+back by SHA with one seek and one small read.
+
+Each month has a single pack named by content hash
+(``YYYY-MM-<hash>.pack`` + ``YYYY-MM-<hash>.idx.json``). Archiving more
+summaries from a month rebuilds its pack under a new name and removes the old
+one instead of appending to it, so branches that archive different summaries
+merge without conflicts; the next rebuild folds any packs a merge left side by
+side back into one. Older appendable ``YYYY-MM.pack`` packs are still readable
+and are folded in the same way.
+
+Usage:
+    python3 summary_archive.py --list
+    python3 summary_archive.py --show <sha-or-prefix>
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+from summary_config import load_config, require_repo_root
+
+
+ARCHIVE_SUBDIR = "archive"
+INDEX_VERSION = 1
+
+SHA_LINE_PATTERN = re.compile(r'^SHA:\s*([0-9a-fA-F]+)\s*$', re.MULTILINE)
+
+
+def get_archive_dir(output_dir):
+    """Return the archive directory inside the summaries directory."""
+    return Path(output_dir) / ARCHIVE_SUBDIR
+
+
+def _pack_paths(archive_dir, stem):
+    """Return ``(pack_path, index_path)`` for a pack name stem."""
+    return archive_dir / f"{stem}.pack", archive_dir / f"{stem}.idx.json"
+
+
+def _load_pack_index(index_path):
+    """Load a pack index, returning an empty index if it does not exist."""
+    if not index_path.exists():
+        return {"version": INDEX_VERSION, "entries": {}}
+    with open(index_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_atomic(path, data):
+    """Write bytes to path via a temp file and rename."""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _summary_key(summary_path, data):
+    match = SHA_LINE_PATTERN.search(data.decode("utf-8", errors="replace"))
+    return match.group(1).lower() if match else summary_path.stem
+
+
+def _month_stems(archive_dir, month):
+    """Return the stems of every pack holding summaries from ``month``."""
+    index_paths = [archive_dir / f"{month}.idx.json", *archive_dir.glob(f"{month}-*.idx.json")]
+    return sorted(path.name[: -len(".idx.json")] for path in index_paths if path.exists())
+
+
+def _read_members(archive_dir, stem):
+    """Return ``{key: (name, member_bytes)}`` for the gzip members of a pack."""
+    pack_path, index_path = _pack_paths(archive_dir, stem)
+    entries = _load_pack_index(index_path).get("entries", {})
+    with open(pack_path, "rb") as f:
+        pack = f.read()
+    return {
+        key: (entry["name"], pack[entry["offset"]:entry["offset"] + entry["length"]])
+        for key, entry in entries.items()
+    }
+
+
+def archive_summaries(output_dir, summary_paths):
+    """Fold the given summaries into their months' packs.
+
+    Each affected month is rebuilt as one pack holding its existing members
+    plus the new summaries, ordered by name so the same set always hashes to
+    the same pack. The new pack and index are written before the old ones are
+    removed, index first, so an interrupted run never leaves an index pointing
+    at a missing pack. Only the packs of the months being archived are read.
+
+    Returns ``(touched_paths, removed_paths, archived_paths)``: the pack and
+    index files written, the superseded ones deleted, and the summaries now
+    safely archived (including any that were already packed). The summaries
+    themselves are left in place; the caller removes them.
+    """
+    archive_dir = get_archive_dir(output_dir)
+
+    months = {}
+    for summary_path in sorted(Path(path) for path in summary_paths):
+        months.setdefault(summary_path.name[:7], []).append(summary_path)
+
+    touched = []
+    removed = []
+    archived = []
+    for month, paths in sorted(months.items()):
+        old_stems = _month_stems(archive_dir, month) if archive_dir.is_dir() else []
+        members = {}
+        for stem in old_stems:
+            members.update(_read_members(archive_dir, stem))
+
+        added = False
+        for summary_path in paths:
+            data = summary_path.read_bytes()
+            key = _summary_key(summary_path, data)
+            if key not in members:
+                members[key] = (summary_path.name, gzip.compress(data, mtime=0))
+                added = True
+        if not added and len(old_stems) <= 1:
+            archived.extend(paths)
+            continue
+
+        pack = bytearray()
+        entries = {}
+        for key, (name, member) in sorted(members.items(), key=lambda item: (item[1][0], item[0])):
+            entries[key] = {"name": name, "offset": len(pack), "length": len(member)}
+            pack.extend(member)
+
+        stem = f"{month}-{hashlib.sha256(pack).hexdigest()[:12]}"
+        pack_path, index_path = _pack_paths(archive_dir, stem)
+        if stem not in old_stems:
+            archive_dir.mkdir(parents=True, exist_ok=True)
+            _write_atomic(pack_path, bytes(pack))
+            index = {"version": INDEX_VERSION, "entries": entries}
+            _write_atomic(index_path, (json.dumps(index, indent=1, sort_keys=True) + "\n").encode("utf-8"))
+            touched.extend([pack_path, index_path])
+        for old_stem in old_stems:
+            if old_stem == stem:
+                continue
+            old_pack, old_index = _pack_paths(archive_dir, old_stem)
+            for path in (old_index, old_pack):
+                path.unlink()
+                removed.append(path)
+        archived.extend(paths)
+    return touched, removed, archived
+
+
+def _iter_pack_indexes(archive_dir):
+    """Yield ``(stem, index)`` for every pack index, newest month first."""
+    if not archive_dir.is_dir():
+        return
+    for index_path in sorted(archive_dir.glob("*.idx.json"), reverse=True):
+        stem = index_path.name[: -len(".idx.json")]
+        try:
+            yield stem, _load_pack_index(index_path)
+        except (OSError, ValueError):
+            continue
+
+
+def find_archived_summary(output_dir, sha):
+    """Locate an archived summary by full or abbreviated SHA.
+
+    Returns ``(stem, key, entry)`` or ``None``. Raises ``ValueError`` when an
+    abbreviated SHA is ambiguous.
+    """
+    prefix = sha.strip().lower()
+    if not prefix:
+        return None
+
+    # Branches may archive the same summary into different packs; keep one copy per key
+    matches = {}
+    for stem, index in _iter_pack_indexes(get_archive_dir(output_dir)):
+        entries = index.get("entries", {})
+        if prefix in entries:
+            return stem, prefix, entries[prefix]
+        for key, entry in entries.items():
+            if key.startswith(prefix):
+                matches.setdefault(key, (stem, key, entry))
+
+    if len(matches) > 1:
+        raise ValueError(f"SHA prefix '{sha}' is ambiguous ({len(matches)} matches)")
+    return next(iter(matches.values()), None)
+
+
+def read_archived_summary(output_dir, sha):
+    """Return the archived summary text for a SHA, or None if not archived."""
+    found = find_archived_summary(output_dir, sha)
+    if found is None:
+        return None
+    stem, _, entry = found
+    pack_path, _ = _pack_paths(get_archive_dir(output_dir), stem)
+    with open(pack_path, "rb") as f:
+        f.seek(entry["offset"])
+        member = f.read(entry["length"])
+    return gzip.decompress(member).decode("utf-8")
+
+
+def get_output_dir():
+    """Return the summaries directory for the current repository."""
+    repo_root = require_repo_root("summary-archive")
+    return repo_root / load_config(repo_root)["summary_dir"]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Inspect compressed archive packs of expired commit summaries."
+    )
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument(
+        "--show",
+        metavar="SHA",
+        help="Print the archived summary for a full or abbreviated commit SHA.",
+    )
+    group.add_argument(
+        "--list",
+        action="store_true",
+        help="List archived summaries by pack.",
+    )
+    args = parser.parse_args()
+    output_dir = get_output_dir()
+
+    if args.list:
+        for stem, index in _iter_pack_indexes(get_archive_dir(output_dir)):
+            entries = index.get("entries", {})
+            print(f"{stem}: {len(entries)} summaries")
+            for key, entry in sorted(entries.items(), key=lambda item: item[1]["name"]):
+                print(f"  {key[:12]}  {entry['name']}")
+        return 0
+
+    try:
+        text = read_archived_summary(output_dir, args.show)
+    except ValueError as e:
+        print(f"[summary-archive] Error: {e}", file=sys.stderr)
+        return 1
+    if text is None:
+        print(f"[summary-archive] No archived summary for {args.show}", file=sys.stderr)
+        return 1
+    sys.stdout.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
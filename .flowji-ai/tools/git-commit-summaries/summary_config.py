@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Shared Git Summaries Configuration
+
+Reads the ``git_summaries`` section of ``.flowji-ai/config.json`` and merges it
+over built-in defaults; ``GIT_SUMMARY_*`` environment variables still override
+both. The file is parsed and validated at most once per process, and the
+validated result is cached in ``.git/flowji-ai/config-cache.json`` keyed by
+the file's mtime and size, so hook runs only pay for a stat and a small read.
+Editing config.json takes effect on the next hook run.
+
+Repository discovery walks up from the working directory instead of calling
+git, so importing this module never spawns a subprocess.
+
+Usage:
+    python3 summary_config.py            # print the effective settings
+    python3 summary_config.py --check    # validate config.json, exit 1 on errors
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no fcntl
+    fcntl = None
+
+
+CONFIG_RELATIVE_PATH = ".flowji-ai/config.json"
+CONFIG_SECTION = "git_summaries"
+CACHE_FILENAME = "config-cache.json"
+CACHE_VERSION = 2
+SUMMARY_COMMIT_LOCK_TIMEOUT = 30
+
+MERGE_MODES = ("first-parent", "per-parent", "conflict-resolution")
+
+DEFAULTS = {
+    "summary_dir": ".flowji-ai/memory/git-summaries",
+    "retention_days": 180,
+    "archive_expired": True,
+    "ignore_patterns": [],
+    "merge_mode": "first-parent",
+    "merge_max_files": 1000,
+    "merge_timeout": 10.0,
+    "symbol_max_bytes": 512 * 1024,
+    "symbol_max_files": 200,
+    "rollup_threshold": 200,
+    "rollup_top_files": 25,
+    "async": False,
+    "batch_size": 1,
+}
+
+ENV_OVERRIDES = {
+    "summary_dir": "GIT_SUMMARY_DIR",
+    "merge_mode": "GIT_SUMMARY_MERGE_MODE",
+    "merge_max_files": "GIT_SUMMARY_MERGE_MAX_FILES",
+    "merge_timeout": "GIT_SUMMARY_MERGE_TIMEOUT",
+    "symbol_max_bytes": "GIT_SUMMARY_SYMBOL_MAX_BYTES",
+    "symbol_max_files": "GIT_SUMMARY_SYMBOL_MAX_FILES",
+    "rollup_threshold": "GIT_SUMMARY_ROLLUP_THRESHOLD",
+    "rollup_top_files": "GIT_SUMMARY_ROLLUP_TOP",
+    "async": "GIT_SUMMARY_ASYNC",
+    "batch_size": "GIT_SUMMARY_BATCH_SIZE",
+}
+
+_loaded = {}
+
+
+def _non_empty_string(value):
+    return isinstance(value, str) and bool(value.strip())
+
+
+def _relative_path(value):
+    # Reject absolute POSIX, UNC and drive-letter paths as well as any '..' part
+    if not _non_empty_string(value) or os.path.isabs(value) or value.startswith(("/", "\\")):
+        return False
+    if value[1:2] == ":":
+        return False
+    return ".." not in value.replace("\\", "/").split("/")
+
+
+def _non_negative_int(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def _positive_int(value):
+    return _non_negative_int(value) and value > 0
+
+
+def _positive_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0
+
+
+def _string_list(value):
+    return isinstance(value, list) and all(_non_empty_string(item) for item in value)
+
+
+# key: (validator, description used in error messages)
+SCHEMA = {
+    "summary_dir": (_relative_path, "a non-empty path inside the repository, without '..'"),
+    "retention_days": (_non_negative_int, "a non-negative integer (0 keeps summaries forever)"),
+    "archive_expired": (lambda value: isinstance(value, bool), "true or false"),
+    "ignore_patterns": (_string_list, "a list of glob patterns"),
+    "merge_mode": (lambda value: value in MERGE_MODES, f"one of {', '.join(MERGE_MODES)}"),
+    "merge_max_files": (_positive_int, "a positive integer"),
+    "merge_timeout": (_positive_number, "a positive number of seconds"),
+    "symbol_max_bytes": (_non_negative_int, "a non-negative integer"),
+    "symbol_max_files": (_non_negative_int, "a non-negative integer (0 disables symbols)"),
+    "rollup_threshold": (_non_negative_int, "a non-negative integer (0 disables rollups)"),
+    "rollup_top_files": (_non_negative_int, "a non-negative integer"),
+    "async": (lambda value: isinstance(value, bool), "true or false"),
+    "batch_size": (_non_negative_int, "a non-negative integer (0 never auto-commits)"),
+}
+
+
+def find_repo_root(start=None):
+    """Return the nearest directory at or above ``start`` containing ``.git``."""
+    current = Path(start or os.getcwd()).resolve()
+    for candidate in (current, *current.parents):
+        if (candidate / ".git").exists():
+            return candidate
+    return None
+
+
+def find_git_dir(repo_root):
+    """Return the git directory for a worktree root without running git."""
+    dot_git = Path(repo_root) / ".git"
+    if dot_git.is_dir():
+        return dot_git
+    try:
+        text = dot_git.read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    if not text.startswith("gitdir:"):
+        return None
+    git_dir = Path(text[len("gitdir:"):].strip())
+    return git_dir if git_dir.is_absolute() else (Path(repo_root) / git_dir).resolve()
+
+
+def find_common_dir(git_dir):
+    """Return the git directory shared by all worktrees of ``git_dir``."""
+    git_dir = Path(git_dir)
+    try:
+        text = (git_dir / "commondir").read_text(encoding="utf-8").strip()
+    except OSError:
+        return git_dir
+    if not text:
+        return git_dir
+    common_dir = Path(text)
+    return common_dir if common_dir.is_absolute() else (git_dir / common_dir).resolve()
+
+
+def find_git_common_dir(repo_root=None):
+    """Return the shared git directory for a worktree root (default: the current one)."""
+    root = repo_root or find_repo_root()
+    git_dir = find_git_dir(root) if root is not None else None
+    return find_common_dir(git_dir) if git_dir is not None else None
+
+
+def require_repo_root(tool):
+    """Return the current repository root, or exit with an error tagged ``[tool]``."""
+    root = find_repo_root()
+    if root is None:
+        print(f"[{tool}] Error: Not in a Git repository", file=sys.stderr)
+        sys.exit(1)
+    return root
+
+
+@contextmanager
+def summary_commit_lock(timeout=SUMMARY_COMMIT_LOCK_TIMEOUT, repo_root=None):
+    """Serialize summary auto-commits and index/digest rewrites across worktrees.
+
+    The lock file lives in the shared git directory, so every worktree, hook
+    and the watcher take turns on the same lock.
+    """
+    lock_dir = find_git_common_dir(repo_root) / "flowji-ai"
+    lock_dir.mkdir(parents=True, exist_ok=True)
+    with open(lock_dir / "summary-commit.lock", "a") as handle:
+        if fcntl is None:
+            yield
+            return
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"summary commit lock busy for {timeout}s")
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def validate_settings(section):
+    """Validate a ``git_summaries`` section.
+
+    Returns ``(settings, errors)``: valid keys only, plus one message per
+    unknown or invalid key.
+    """
+    if not isinstance(section, dict):
+        return {}, [f"'{CONFIG_SECTION}' must be an object"]
+
+    settings = {}
+    errors = []
+    for key, value in section.items():
+        if key not in SCHEMA:
+            errors.append(f"unknown setting '{key}'")
+            continue
+        validator, description = SCHEMA[key]
+        if not validator(value):
+            errors.append(f"'{key}' must be {description}, got {value!r}")
+            continue
+        settings[key] = float(value) if key == "merge_timeout" else value
+    return settings, errors
+
+
+def read_config_file(config_path):
+    """Read and validate a config.json without caching; returns ``(settings, errors)``."""
+    try:
+        with open(config_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        return {}, [f"could not parse {CONFIG_RELATIVE_PATH}: {e}"]
+    if not isinstance(data, dict):
+        return {}, [f"{CONFIG_RELATIVE_PATH} must contain a JSON object"]
+    if CONFIG_SECTION not in data:
+        return {}, []
+    return validate_settings(data[CONFIG_SECTION])
+
+
+def _read_cached(cache_path, stat):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (
+        cache.get("version") == CACHE_VERSION
+        and cache.get("mtime_ns") == stat.st_mtime_ns
+        and cache.get("size") == stat.st_size
+    ):
+        return cache.get("settings", {}), cache.get("errors", [])
+    return None
+
+
+def _write_cached(cache_path, stat, settings, errors):
+    cache = {
+        "version": CACHE_VERSION,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "settings": settings,
+        "errors": errors,
+    }
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, separators=(",", ":"))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+def config_stamp(repo_root):
+    """Return ``(mtime_ns, size)`` of config.json, or None when there is none.
+
+    Long-running processes compare stamps to know when to call
+    ``load_config(reload=True)``.
+    """
+    try:
+        stat = (Path(repo_root) / CONFIG_RELATIVE_PATH).stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_file_settings(repo_root):
+    """Return validated ``(settings, errors)`` from config.json, using the mtime cache."""
+    config_path = Path(repo_root) / CONFIG_RELATIVE_PATH
+    try:
+        stat = config_path.stat()
+    except OSError:
+        return {}, []
+
+    git_dir = find_git_dir(repo_root)
+    cache_path = git_dir / "flowji-ai" / CACHE_FILENAME if git_dir else None
+    if cache_path is not None:
+        cached = _read_cached(cache_path, stat)
+        if cached is not None:
+            return cached
+
+    settings, errors = read_config_file(config_path)
+    if cache_path is not None:
+        _write_cached(cache_path, stat, settings, errors)
+    return settings, errors
+
+
+def _apply_env(config, errors):
+    for key, variable in ENV_OVERRIDES.items():
+        raw = os.environ.get(variable, "").strip()
+        if not raw:
+            continue
+        default = DEFAULTS[key]
+        try:
+            if isinstance(default, bool):
+                value = raw.lower() in ("1", "true", "yes", "on")
+            elif isinstance(default, int):
+                value = int(raw)
+            elif isinstance(default, float):
+                value = float(raw)
+            else:
+                value = raw
+        except ValueError:
+            errors.append(f"{variable}={raw!r} is not valid, ignoring")
+            continue
+        # Environment paths may be absolute, unlike config.json entries
+        validator, description = SCHEMA[key]
+        if key != "summary_dir" and not validator(value):
+            errors.append(f"{variable} must be {description}, ignoring {raw!r}")
+            continue
+        config[key] = value
+
+
+def load_config(repo_root=None, reload=False):
+    """Return the effective settings: defaults < config.json < environment.
+
+    The result is memoised per repository for the life of the process; pass
+    ``reload=True`` to pick up edits to config.json (the watcher does this
+    whenever ``config_stamp()`` changes).
+    Problems are printed once per load as warnings and never raise.
+    """
+    root = Path(repo_root).resolve() if repo_root else find_repo_root()
+    key = str(root) if root else ""
+    if not reload and key in _loaded:
+        return _loaded[key]
+
+    config = dict(DEFAULTS)
+    config["ignore_patterns"] = list(DEFAULTS["ignore_patterns"])
+    errors = []
+    if root is not None:
+        settings, errors = load_file_settings(root)
+        errors = list(errors)
+        config.update(settings)
+    _apply_env(config, errors)
+
+    for error in errors:
+        print(f"[summary-config] Warning: {error}", file=sys.stderr)
+    _loaded[key] = config
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=f"Show or validate the '{CONFIG_SECTION}' section of {CONFIG_RELATIVE_PATH}."
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Validate config.json and exit 1 if it has errors.",
+    )
+    args = parser.parse_args()
+
+    repo_root = require_repo_root("summary-config")
+
+    if args.check:
+        config_path = repo_root / CONFIG_RELATIVE_PATH
+        if not config_path.exists():
+            print(f"✓ No {CONFIG_RELATIVE_PATH}; using defaults")
+            return 0
+        _, errors = read_config_file(config_path)
+        for error in errors:
+            print(f"❌ {error}")
+        if errors:
+            return 1
+        print(f"✓ {CONFIG_RELATIVE_PATH} is valid")
+        return 0
+
+    print(json.dumps(load_config(repo_root), indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Summary Index
+
+Parses generated commit summaries and keeps a small metadata index (SHA, branch,
+subject, touched paths, token estimates) under the git directory so tools that
+read summaries do not have to re-parse every file on each run.
+"""
+import json
+import math
+import os
+import re
+from pathlib import Path
+
+from summary_config import find_git_dir
+
+
+SUMMARY_FILENAME_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}--\d{6}Z(_\d+)?\.md$')
+LINK_ITEM_PATTERN = re.compile(r'\[([^\]]+)\]\(\./[^)]*\)')
+ROLLUP_TOTAL_PATTERN = re.compile(r'^(\d+) files? changed')
+ROLLUP_DIRECTORY_PATTERN = re.compile(r'^\s*- `([^`]+)/` — (\d+) (?:top-level )?files?\b')
+ROLLUP_MORE_PATTERN = re.compile(r'^- \.\.\. and \d+ more directories \((\d+) files?\)')
+
+# Bucket for top-level directories the rollup tree lists only as a count
+ROLLUP_OTHER_DIRECTORIES = "(other directories)"
+
+INDEX_VERSION = 3
+INDEX_FILENAME = "summary-index.json"
+
+FILE_SECTIONS = ("Files Created", "Files Edited", "Files Deleted", "Other Changes")
+ROLLUP_SECTION = "Directory Rollup"
+
+# Representation levels from richest to cheapest, used by the context packer.
+LEVEL_FULL = "full"
+LEVEL_NO_STATS = "no-stats"
+LEVEL_COMPACT = "compact"
+LEVEL_DIGEST = "digest"
+LEVELS = (LEVEL_FULL, LEVEL_NO_STATS, LEVEL_COMPACT, LEVEL_DIGEST)
+
+COMPACT_MAX_FILES = 8
+COMPACT_MAX_BODY_LINES = 12
+
+
+def is_summary_filename(name):
+    """Return True if the name matches the summary naming pattern."""
+    return bool(SUMMARY_FILENAME_PATTERN.match(name))
+
+
+def estimate_tokens(text):
+    """Rough token estimate (~4 characters per token)."""
+    if not text:
+        return 0
+    return int(math.ceil(len(text) / 4.0))
+
+
+def parse_summary_text(text):
+    """Parse summary Markdown into frontmatter fields, body and named sections.
+
+    Returns a dict with ``meta`` (frontmatter key/values), ``preamble`` (title
+    and commit message lines before the first file section) and ``sections``
+    (ordered list of ``(name, lines)`` tuples for each ``## `` section).
+    """
+    lines = text.splitlines()
+    meta = {}
+    index = 0
+
+    if lines and lines[0].strip() == "---":
+        index = 1
+        while index < len(lines) and lines[index].strip() != "---":
+            key, sep, value = lines[index].partition(":")
+            if sep:
+                meta[key.strip()] = value.strip()
+            index += 1
+        index += 1
+
+    preamble = []
+    sections = []
+    current = None
+    in_fence = False
+
+    for line in lines[index:]:
+        if line.startswith("```"):
+            in_fence = not in_fence
+        if not in_fence and line.startswith("## ") and line[3:].strip() != "Commit Subject":
+            current = (line[3:].strip(), [])
+            sections.append(current)
+            continue
+        if current is None:
+            preamble.append(line)
+        else:
+            current[1].append(line)
+
+    return {"meta": meta, "preamble": preamble, "sections": sections}
+
+
+def _section_paths(section_lines):
+    """Extract linked paths from a section's bullet list."""
+    paths = []
+    for line in section_lines:
+        if not line.startswith("- "):
+            continue
+        links = [match.group(1) for match in LINK_ITEM_PATTERN.finditer(line)]
+        # Renames link old and new; count the commit's file once, by its new path
+        if line.startswith("- renamed: "):
+            links = links[-1:]
+        paths.extend(links)
+    return paths
+
+
+def _rollup_directories(section_lines):
+    """Return ``(file_count, {directory: files})`` from a Directory Rollup section.
+
+    Rolled-up summaries link only their hottest files, so the true file count
+    and the per-directory subtree counts come from the rollup lines instead.
+    Top-level files are counted under ``"."`` and top-level directories cut
+    from the tree under ROLLUP_OTHER_DIRECTORIES. Nested cut directories need
+    no entry: their files are still inside the parent's subtree count.
+    """
+    file_count = None
+    directories = {}
+    for line in section_lines:
+        total = ROLLUP_TOTAL_PATTERN.match(line)
+        if total and file_count is None:
+            file_count = int(total.group(1))
+            continue
+        directory = ROLLUP_DIRECTORY_PATTERN.match(line)
+        if directory:
+            directories[directory.group(1)] = int(directory.group(2))
+            continue
+        more = ROLLUP_MORE_PATTERN.match(line)
+        if more:
+            directories[ROLLUP_OTHER_DIRECTORIES] = int(more.group(1))
+    return file_count, directories
+
+
+def _subject_from_meta(meta):
+    """Return the unquoted subject stored in frontmatter."""
+    subject = meta.get("Subject", "")
+    if len(subject) >= 2 and subject[0] == subject[-1] and subject[0] in ("'", '"'):
+        subject = subject[1:-1]
+    return subject.replace("\\'", "'").replace('\\"', '"')
+
+
+def _render_sections(parsed, drop_stats=False, max_files=None, max_body_lines=None):
+    """Render a parsed summary back to Markdown with optional trimming."""
+    preamble = list(parsed["preamble"])
+    if max_body_lines is not None and len(preamble) > max_body_lines:
+        preamble = preamble[:max_body_lines] + ["(message truncated)", ""]
+
+    out = ["---"]
+    out.extend(f"{key}: {value}" for key, value in parsed["meta"].items())
+    out.append("---")
+    out.extend(preamble)
+
+    for name, section_lines in parsed["sections"]:
+        if drop_stats and name == "Stats":
+            continue
+        out.append(f"## {name}")
+        if max_files is not None and name in FILE_SECTIONS:
+            items = [line for line in section_lines if line.startswith("- ")]
+            if len(items) > max_files:
+                out.append("")
+                out.extend(items[:max_files])
+                out.append(f"- ... and {len(items) - max_files} more")
+                out.append("")
+                continue
+        out.extend(section_lines)
+
+    return "\n".join(out).rstrip() + "\n"
+
+
+def render_digest(entry):
+    """Return a one-line digest for an index entry."""
+    date = entry.get("timestamp", "")[:10] or entry.get("name", "")[:10]
+    sha = entry.get("sha", "")[:7] or "unknown"
+    subject = entry.get("subject") or "(no subject)"
+    file_count = entry.get("file_count", 0)
+    plural = "file" if file_count == 1 else "files"
+    return f"- {date} {sha} ({entry.get('branch', '?')}) {subject} — {file_count} {plural}\n"
+
+
+def render_level(parsed, entry, level):
+    """Render a summary at the requested representation level."""
+    if level == LEVEL_FULL:
+        return parsed["raw"]
+    if level == LEVEL_NO_STATS:
+        return _render_sections(parsed, drop_stats=True)
+    if level == LEVEL_COMPACT:
+        return _render_sections(
+            parsed,
+            drop_stats=True,
+            max_files=COMPACT_MAX_FILES,
+            max_body_lines=COMPACT_MAX_BODY_LINES,
+        )
+    return render_digest(entry)
+
+
+def parse_summary_file(path):
+    """Parse a summary file and return ``(parsed, entry)`` for the index."""
+    path = Path(path)
+    text = path.read_text(encoding="utf-8", errors="replace")
+    parsed = parse_summary_text(text)
+    parsed["raw"] = text
+    meta = parsed["meta"]
+
+    paths = []
+    rollup = None
+    for name, section_lines in parsed["sections"]:
+        if name in FILE_SECTIONS:
+            paths.extend(_section_paths(section_lines))
+        elif name == ROLLUP_SECTION:
+            rollup = _rollup_directories(section_lines)
+
+    stat = path.stat()
+    entry = {
+        "name": path.name,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha": meta.get("SHA", ""),
+        "branch": meta.get("Branch", ""),
+        "timestamp": meta.get("Date Created", ""),
+        "author": meta.get("Author", ""),
+        "subject": _subject_from_meta(meta),
+        "paths": paths,
+        "file_count": len(paths),
+    }
+    if rollup is not None:
+        file_count, directories = rollup
+        # Directory prefixes keep focus filtering working for unlisted files
+        entry["paths"] = paths + [
+            f"{directory}/" for directory in directories
+            if directory not in (".", ROLLUP_OTHER_DIRECTORIES)
+        ]
+        entry["file_count"] = file_count if file_count is not None else len(paths)
+        entry["directories"] = directories
+    entry["tokens"] = {
+        level: estimate_tokens(render_level(parsed, entry, level)) for level in LEVELS
+    }
+    return parsed, entry
+
+
+def get_index_path(repo_root):
+    """Return the path of the on-disk index, or None outside a git repo."""
+    git_dir = find_git_dir(repo_root)
+    if git_dir is None:
+        return None
+    return git_dir / "flowji-ai" / INDEX_FILENAME
+
+
+def load_index(index_path):
+    """Load the cached index, returning an empty one if missing or stale."""
+    empty = {"version": INDEX_VERSION, "entries": {}}
+    if index_path is None or not index_path.exists():
+        return empty
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return empty
+    if data.get("version") != INDEX_VERSION or not isinstance(data.get("entries"), dict):
+        return empty
+    return data
+
+
+def save_index(index_path, index):
+    """Atomically persist the index next to other git metadata."""
+    if index_path is None:
+        return
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+    os.replace(tmp_path, index_path)
+
+
+def update_index_entries(output_dir, index, names):
+    """Re-index only the given summary filenames; returns True if changed."""
+    output_dir = Path(output_dir)
+    entries = index["entries"]
+    changed = False
+
+    for name in names:
+        if not is_summary_filename(name):
+            continue
+        path = output_dir / name
+        try:
+            stat = path.stat()
+        except OSError:
+            if entries.pop(name, None) is not None:
+                changed = True
+            continue
+        cached = entries.get(name)
+        if cached and cached.get("mtime_ns") == stat.st_mtime_ns and cached.get("size") == stat.st_size:
+            continue
+        try:
+            _, entry = parse_summary_file(path)
+        except OSError:
+            continue
+        entries[name] = entry
+        changed = True
+
+    return changed
+
+
+def refresh_index(output_dir, index):
+    """Bring the index in line with the directory; returns True if changed."""
+    output_dir = Path(output_dir)
+    entries = index["entries"]
+    changed = False
+
+    try:
+        current = {
+            item.name
+            for item in os.scandir(output_dir)
+            if item.is_file() and is_summary_filename(item.name)
+        }
+    except FileNotFoundError:
+        current = set()
+
+    for name in list(entries):
+        if name not in current:
+            del entries[name]
+            changed = True
+
+    if update_index_entries(output_dir, index, sorted(current)):
+        changed = True
+    return changed
+
+
+def load_refreshed_index(repo_root, output_dir):
+    """Load the cached index, refresh it against disk and save if needed."""
+    index_path = get_index_path(repo_root)
+    index = load_index(index_path)
+    if refresh_index(output_dir, index):
+        try:
+            save_index(index_path, index)
+        except OSError:
+            pass
+    return index
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Periodic Rollup Digests
+
+Maintains daily and weekly digest files under ``<summaries>/rollups/`` that
+aggregate commit subjects, authors and touched directories. The aggregation
+state behind each digest lives in ``.git/flowji-ai/rollup-state/``, so adding a
+commit only reads and rewrites the state and digest for that commit's day and
+week, and the digests themselves stay plain Markdown.
+
+Digests are derived, per-clone files: the rollups directory ignores itself in
+git so digests edited on two branches never produce merge conflicts. The
+post-merge and post-checkout hooks (``summary_watch.py``) fold in summaries
+that arrive by pull or clone; ``--backfill`` folds in everything at once.
+
+Usage:
+    python3 summary_rollups.py --backfill
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from summary_config import find_git_dir, load_config, require_repo_root
+from summary_index import ROLLUP_OTHER_DIRECTORIES, is_summary_filename, parse_summary_file
+
+
+ROLLUP_SUBDIR = "rollups"
+STATE_SUBDIR = "rollup-state"
+PERIODS = ("daily", "weekly")
+DIRECTORY_DEPTH = 2
+MAX_LISTED_DIRECTORIES = 25
+
+# Digests written before the state moved to the git dir embedded it here
+LEGACY_STATE_PATTERN = re.compile(r'^<!-- rollup-state: (.*) -->$', re.MULTILINE)
+
+
+def get_rollup_dir(output_dir):
+    """Return the rollups directory inside the summaries directory."""
+    return Path(output_dir) / ROLLUP_SUBDIR
+
+
+def get_state_dir(repo_root):
+    """Return the directory holding digest state, or None outside a git repo."""
+    git_dir = find_git_dir(repo_root)
+    if git_dir is None:
+        return None
+    return git_dir / "flowji-ai" / STATE_SUBDIR
+
+
+def _parse_timestamp(timestamp_str):
+    """Return datetime from an ISO timestamp, tolerating trailing Z."""
+    return datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
+
+
+def period_keys(timestamp_str):
+    """Return ``{"daily": "YYYY-MM-DD", "weekly": "YYYY-Www"}`` for a timestamp."""
+    dt = _parse_timestamp(timestamp_str)
+    return {
+        "daily": dt.strftime("%Y-%m-%d"),
+        "weekly": dt.strftime("%G-W%V"),
+    }
+
+
+def _directory_of(path):
+    """Return the directory bucket (up to DIRECTORY_DEPTH levels) for a path."""
+    parts = path.replace("\\", "/").strip("/").split("/")[:-1]
+    if not parts:
+        return "."
+    return "/".join(parts[:DIRECTORY_DEPTH])
+
+
+def record_from_commit(commit_info, file_changes):
+    """Build a rollup record from post-commit data."""
+    paths = []
+    paths.extend(file_changes.get("created", []))
+    paths.extend(file_changes.get("edited", []))
+    paths.extend(file_changes.get("deleted", []))
+    paths.extend(new for _, new in file_changes.get("renamed", []))
+    paths.extend(item.split(": ", 1)[-1] for item in file_changes.get("other", []))
+    return {
+        "sha": commit_info["sha_full"],
+        "subject": commit_info["subject"] or "(no subject)",
+        "author": commit_info["author_name"],
+        "timestamp": commit_info["timestamp"],
+        "paths": paths,
+    }
+
+
+def record_from_index_entry(entry):
+    """Build a rollup record from a summary index entry."""
+    author = entry.get("author", "")
+    return {
+        "sha": entry.get("sha", ""),
+        "subject": entry.get("subject") or "(no subject)",
+        "author": author.split(" <", 1)[0] if author else "unknown",
+        "timestamp": entry.get("timestamp", ""),
+        "paths": entry.get("paths", []),
+        "file_count": entry.get("file_count"),
+        "directories": entry.get("directories"),
+    }
+
+
+def _rollup_buckets(directories):
+    """Turn Directory Rollup subtree counts into ``_directory_of`` buckets.
+
+    Each directory down to DIRECTORY_DEPTH keeps the files not accounted for by
+    its listed children; deeper directories are already inside their bucket.
+    """
+    buckets = {}
+    for directory, count in directories.items():
+        depth = 0 if directory in (".", ROLLUP_OTHER_DIRECTORIES) else directory.count("/") + 1
+        if depth > DIRECTORY_DEPTH:
+            continue
+        if 0 < depth < DIRECTORY_DEPTH:
+            count -= sum(
+                files for child, files in directories.items()
+                if child.startswith(f"{directory}/") and child.count("/") == depth
+            )
+        if count > 0:
+            buckets[directory] = count
+    return buckets
+
+
+def _directory_counts(record):
+    """Return ``{bucket: files}`` for a record."""
+    if record.get("directories"):
+        return _rollup_buckets(record["directories"])
+    counts = {}
+    for path in record["paths"]:
+        bucket = _directory_of(path)
+        counts[bucket] = counts.get(bucket, 0) + 1
+    return counts
+
+
+def _empty_state(kind, key):
+    return {"kind": kind, "period": key, "commits": [], "authors": {}, "directories": {}}
+
+
+def _read_state(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if isinstance(state, dict) else None
+
+
+def _read_legacy_state(digest_path):
+    try:
+        text = digest_path.read_text(encoding="utf-8")
+    except OSError:
+        return None
+    match = LEGACY_STATE_PATTERN.search(text)
+    if not match:
+        return None
+    try:
+        return json.loads(match.group(1))
+    except ValueError:
+        return None
+
+
+def load_state(state_path, digest_path, kind, key):
+    """Read a period's aggregation state, migrating it out of an old digest."""
+    state = _read_state(state_path)
+    if state is None:
+        state = _read_legacy_state(digest_path)
+    return state or _empty_state(kind, key)
+
+
+def _adjust(counts, key, delta):
+    counts[key] = counts.get(key, 0) + delta
+    if counts[key] <= 0:
+        del counts[key]
+
+
+def add_record(state, record):
+    """Fold a commit record into a period state; returns False if unchanged.
+
+    A record for a commit already in the state replaces it, so an edited
+    summary updates its digest line, author and directory counts.
+    """
+    commit = {
+        "sha": record["sha"],
+        "subject": record["subject"],
+        "author": record["author"],
+        "timestamp": record["timestamp"],
+        "files": record.get("file_count") or len(record["paths"]),
+        "directories": _directory_counts(record),
+    }
+    for position, existing in enumerate(state["commits"]):
+        if existing["sha"] != commit["sha"]:
+            continue
+        if existing == commit:
+            return False
+        # Older digests kept no per-commit directories; assume the file list is unchanged
+        existing.setdefault("directories", commit["directories"])
+        del state["commits"][position]
+        _adjust(state["authors"], existing["author"], -1)
+        for bucket, count in existing["directories"].items():
+            _adjust(state["directories"], bucket, -count)
+        break
+
+    state["commits"].append(commit)
+    _adjust(state["authors"], commit["author"], 1)
+    for bucket, count in commit["directories"].items():
+        _adjust(state["directories"], bucket, count)
+    return True
+
+
+def render_digest(state):
+    """Render a period state as Markdown."""
+    kind = state["kind"]
+    title = "Daily Digest" if kind == "daily" else "Weekly Digest"
+    commits = sorted(state["commits"], key=lambda commit: commit["timestamp"])
+    total_files = sum(commit["files"] for commit in commits)
+
+    lines = [
+        f"# {title} — {state['period']}",
+        "",
+        f"Commits: {len(commits)} · Authors: {len(state['authors'])} · File changes: {total_files}",
+        "",
+        "## Commits",
+        "",
+    ]
+    for commit in commits:
+        when = commit["timestamp"][:16].replace("T", " ")
+        if kind == "daily":
+            when = when[11:]
+        lines.append(
+            f"- {when} `{commit['sha'][:7]}` {commit['subject']} — {commit['author']} ({commit['files']} files)"
+        )
+
+    lines.extend(["", "## Authors", ""])
+    for author, count in sorted(state["authors"].items(), key=lambda item: (-item[1], item[0])):
+        plural = "commit" if count == 1 else "commits"
+        lines.append(f"- {author} — {count} {plural}")
+
+    lines.extend(["", "## Directories", ""])
+    directories = sorted(state["directories"].items(), key=lambda item: (-item[1], item[0]))
+    if not directories:
+        lines.append("(none)")
+    for directory, count in directories[:MAX_LISTED_DIRECTORIES]:
+        plural = "change" if count == 1 else "changes"
+        label = directory if directory == ROLLUP_OTHER_DIRECTORIES else f"{directory}/"
+        lines.append(f"- {label} — {count} {plural}")
+    if len(directories) > MAX_LISTED_DIRECTORIES:
+        lines.append(f"- ... and {len(directories) - MAX_LISTED_DIRECTORIES} more directories")
+
+    return "\n".join(lines) + "\n"
+
+
+def _ensure_ignored(rollup_dir):
+    """Keep digests out of version control with a self-ignoring .gitignore."""
+    gitignore = rollup_dir / ".gitignore"
+    if not gitignore.exists():
+        rollup_dir.mkdir(parents=True, exist_ok=True)
+        gitignore.write_text(
+            "# Local rollup digests; rebuild with summary_rollups.py --backfill\n*\n",
+            encoding="utf-8",
+        )
+
+
+def _write_atomic(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def update_rollups(repo_root, output_dir, records):
+    """Fold records into their daily and weekly digests.
+
+    Records are grouped by period first so each affected state and digest is
+    read and written once. Returns the list of digest paths that changed.
+    """
+    state_dir = get_state_dir(repo_root)
+    if state_dir is None:
+        return []
+    rollup_dir = get_rollup_dir(output_dir)
+    grouped = {}
+    for record in records:
+        if not record.get("sha") or not record.get("timestamp"):
+            continue
+        try:
+            keys = period_keys(record["timestamp"])
+        except ValueError:
+            continue
+        for kind in PERIODS:
+            grouped.setdefault((kind, keys[kind]), []).append(record)
+
+    touched = []
+    if grouped:
+        _ensure_ignored(rollup_dir)
+    for (kind, key), period_records in sorted(grouped.items()):
+        path = rollup_dir / kind / f"{key}.md"
+        state_path = state_dir / kind / f"{key}.json"
+        state = load_state(state_path, path, kind, key)
+        changed = False
+        for record in period_records:
+            if add_record(state, record):
+                changed = True
+        # A digest still carrying its state comment is rewritten once to drop it
+        if changed or not state_path.exists():
+            _write_atomic(state_path, json.dumps(state, separators=(",", ":"), sort_keys=True))
+            _write_atomic(path, render_digest(state))
+            touched.append(path)
+    return touched
+
+
+def backfill(repo_root, output_dir):
+    """Fold every existing summary into the rollups; returns touched paths."""
+    output_dir = Path(output_dir)
+    records = []
+    for path in sorted(output_dir.glob("*.md")):
+        if not is_summary_filename(path.name):
+            continue
+        try:
+            _, entry = parse_summary_file(path)
+        except OSError:
+            continue
+        records.append(record_from_index_entry(entry))
+    return update_rollups(repo_root, output_dir, records)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Maintain daily and weekly rollup digests of commit summaries."
+    )
+    parser.add_argument(
+        "--backfill",
+        action="store_true",
+        help="Fold all existing summaries into their daily and weekly digests.",
+    )
+    args = parser.parse_args()
+    if not args.backfill:
+        parser.print_help()
+        return 0
+
+    repo_root = require_repo_root("summary-rollups")
+    touched = backfill(repo_root, repo_root / load_config(repo_root)["summary_dir"])
+    print(f"[summary-rollups] updated {len(touched)} digest(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Summary Directory Watcher
+
+Keeps the derived summary index (``.git/flowji-ai/summary-index.json``) and the
+local rollup digests in step with the summaries directory when files are
+edited, deleted or moved by hand, or arrive through a pull. Only the summary
+files that changed are re-parsed; nothing is rebuilt from scratch.
+
+Two ways to use it:
+
+- Hooks: the ``post-merge`` and ``post-checkout`` hooks call ``--hook`` with
+  git's hook arguments; the summaries that differ between the old and new
+  HEAD are re-indexed.
+- Watcher: ``--watch`` follows the directory with inotify on Linux and falls
+  back to polling mtimes elsewhere. ``--detach`` runs it in the background,
+  ``--status`` and ``--stop`` manage that process.
+
+Usage:
+    python3 summary_watch.py --watch
+    python3 summary_watch.py --watch --detach
+    python3 summary_watch.py --status
+    python3 summary_watch.py --stop
+    python3 summary_watch.py --hook post-merge 0
+"""
+import argparse
+import os
+import select
+import signal
+import struct
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from summary_config import config_stamp, find_git_dir, load_config, require_repo_root, summary_commit_lock
+from summary_index import (
+    get_index_path,
+    is_summary_filename,
+    load_index,
+    load_refreshed_index,
+    save_index,
+    update_index_entries,
+)
+from summary_rollups import record_from_index_entry, update_rollups
+
+
+ZERO_SHA = "0" * 40
+DEFAULT_POLL_INTERVAL = 2.0
+DEBOUNCE_SECONDS = 0.5
+CONFIG_CHECK_INTERVAL = 2.0
+PID_FILENAME = "summary-watch.pid"
+LOG_FILENAME = "summary-watch.log"
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+WATCH_MASK = (
+    IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    | IN_DELETE_SELF | IN_MOVE_SELF
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def reindex(repo_root, output_dir, names):
+    """Re-index the given summary filenames and fold new ones into rollups.
+
+    Edited summaries replace their commit's line in the digests. Deleted files
+    drop out of the index; rollups keep them, since digests record history
+    rather than the current directory. Runs under the summary commit lock so
+    it never interleaves with a post-commit hook rewriting the same files.
+    Returns the number of summary files looked at.
+    """
+    names = sorted({name for name in names if is_summary_filename(name)})
+    if not names:
+        return 0
+
+    with summary_commit_lock(repo_root=repo_root):
+        index_path = get_index_path(repo_root)
+        index = load_index(index_path)
+        before = {name: index["entries"].get(name) for name in names}
+        if update_index_entries(output_dir, index, names):
+            save_index(index_path, index)
+
+        records = [
+            record_from_index_entry(index["entries"][name])
+            for name in names
+            if name in index["entries"] and index["entries"][name] is not before[name]
+        ]
+        if records:
+            update_rollups(repo_root, output_dir, records)
+    return len(names)
+
+
+def full_refresh(repo_root, output_dir):
+    """Bring the index in line with the directory (used when no diff is available)."""
+    with summary_commit_lock(repo_root=repo_root):
+        index = load_refreshed_index(repo_root, output_dir)
+        update_rollups(repo_root, output_dir, [record_from_index_entry(entry) for entry in index["entries"].values()])
+    return len(index["entries"])
+
+
+def changed_summary_names(summary_subdir, old_rev, new_rev):
+    """Return summary filenames that differ between two commits, or None if unknown."""
+    subdir = summary_subdir.replace("\\", "/").strip("/")
+    try:
+        result = subprocess.run(
+            ["git", "diff", "--name-only", "--no-renames", "-z", old_rev, new_rev, "--", subdir],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+    except subprocess.CalledProcessError:
+        return None
+
+    names = []
+    for path in result.stdout.split("\0"):
+        parent, _, name = path.rpartition("/")
+        if parent == subdir and is_summary_filename(name):
+            names.append(name)
+    return names
+
+
+def run_hook(repo_root, hook_name, hook_args):
+    """Handle a ``post-merge`` or ``post-checkout`` hook invocation."""
+    summary_subdir = load_config(repo_root)["summary_dir"]
+    output_dir = Path(repo_root) / summary_subdir
+
+    if hook_name == "post-checkout":
+        # Arguments: <old-head> <new-head> <branch-flag>; 0 means a file checkout
+        if len(hook_args) < 3 or hook_args[2] != "1":
+            return 0
+        old_rev, new_rev = hook_args[0], hook_args[1]
+    else:
+        old_rev, new_rev = "ORIG_HEAD", "HEAD"
+
+    if old_rev == new_rev:
+        return 0
+    names = None if old_rev == ZERO_SHA else changed_summary_names(summary_subdir, old_rev, new_rev)
+    if names is None:
+        count = full_refresh(repo_root, output_dir)
+        print(f"[summary-watch] indexed {count} summaries")
+    elif names:
+        reindex(repo_root, output_dir, names)
+        print(f"[summary-watch] re-indexed {len(names)} changed summaries")
+    return 0
+
+
+def _snapshot(output_dir):
+    """Return ``{name: (mtime_ns, size)}`` for the summaries in output_dir."""
+    snapshot = {}
+    try:
+        for entry in os.scandir(output_dir):
+            if entry.is_file() and is_summary_filename(entry.name):
+                stat = entry.stat()
+                snapshot[entry.name] = (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        pass
+    return snapshot
+
+
+def poll_loop(repo_root, output_dir, interval, stamp=None):
+    """Re-index files whose mtime or size changed since the last scan.
+
+    Returns when config.json no longer matches ``stamp``.
+    """
+    previous = _snapshot(output_dir)
+    while True:
+        time.sleep(interval)
+        if config_stamp(repo_root) != stamp:
+            return
+        current = _snapshot(output_dir)
+        changed = [name for name in current.keys() | previous.keys() if current.get(name) != previous.get(name)]
+        if changed:
+            try:
+                reindex(repo_root, output_dir, changed)
+            except TimeoutError as e:
+                # Keep the old snapshot so the same files are retried next scan
+                print(f"[summary-watch] {e}; retrying", flush=True)
+                continue
+            print(f"[summary-watch] re-indexed {len(changed)} summaries", flush=True)
+        previous = current
+
+
+def _load_libc():
+    """Return libc with inotify bound, or None where inotify is unavailable."""
+    if not sys.platform.startswith("linux"):
+        return None
+    import ctypes
+    import ctypes.util
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return libc
+
+
+def _read_events(fd):
+    """Yield ``(mask, name)`` for each inotify event currently readable on fd."""
+    data = os.read(fd, 64 * 1024)
+    offset = 0
+    while offset + EVENT_HEADER.size <= len(data):
+        _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+        start = offset + EVENT_HEADER.size
+        name = data[start:start + length].rstrip(b"\0").decode("utf-8", errors="replace")
+        offset = start + length
+        yield mask, name
+
+
+def inotify_loop(libc, repo_root, output_dir, stamp=None):
+    """Re-index files named by inotify events, batching bursts of events.
+
+    Returns when the watched directory itself is removed or moved, or when
+    config.json no longer matches ``stamp`` (checked every few seconds).
+    """
+    fd = libc.inotify_init1(os.O_CLOEXEC)
+    if fd < 0:
+        raise OSError("inotify_init1 failed")
+    try:
+        if libc.inotify_add_watch(fd, os.fsencode(str(output_dir)), WATCH_MASK) < 0:
+            raise OSError(f"cannot watch {output_dir}")
+        # Catch up only once the watch is live, so no change slips between the two
+        full_refresh(repo_root, output_dir)
+        pending = set()
+        while True:
+            # Wake up periodically to notice config edits and retry names
+            # left over from a busy lock
+            ready = select.select([fd], [], [], CONFIG_CHECK_INTERVAL)[0]
+            gone = False
+            deadline = time.monotonic() + DEBOUNCE_SECONDS
+            while ready:
+                for mask, name in _read_events(fd):
+                    if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                        gone = True
+                    elif name:
+                        pending.add(name)
+                remaining = deadline - time.monotonic()
+                ready = remaining > 0 and select.select([fd], [], [], remaining)[0]
+            if pending:
+                try:
+                    count = reindex(repo_root, output_dir, pending)
+                except TimeoutError as e:
+                    print(f"[summary-watch] {e}; retrying", flush=True)
+                    count = None
+                else:
+                    pending = set()
+                if count:
+                    print(f"[summary-watch] re-indexed {count} summaries", flush=True)
+            if gone or config_stamp(repo_root) != stamp:
+                return
+    finally:
+        os.close(fd)
+
+
+def watch(repo_root, interval, force_poll=False):
+    """Watch the summaries directory until interrupted.
+
+    Settings are reloaded whenever config.json changes, so a new
+    ``summary_dir`` is picked up without restarting the watcher.
+    """
+    libc = None if force_poll else _load_libc()
+    watching = None
+    while True:
+        stamp = config_stamp(repo_root)
+        output_dir = Path(repo_root) / load_config(repo_root, reload=True)["summary_dir"]
+        mode = "inotify" if libc else f"polling every {interval:g}s"
+        if (output_dir, mode) != watching:
+            print(f"[summary-watch] watching {output_dir} ({mode})", flush=True)
+            watching = (output_dir, mode)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            if libc is None:
+                # Catch up on anything that changed while nobody was watching
+                full_refresh(repo_root, output_dir)
+                poll_loop(repo_root, output_dir, interval, stamp)
+            else:
+                inotify_loop(libc, repo_root, output_dir, stamp)
+        except TimeoutError as e:
+            # A long post-commit hook holds the lock; try the catch-up again
+            print(f"[summary-watch] {e}; retrying", flush=True)
+            time.sleep(interval)
+        except OSError as e:
+            if libc is None:
+                raise
+            print(f"[summary-watch] inotify unavailable ({e}), polling instead", flush=True)
+            libc = None
+
+
+def _pid_path(repo_root):
+    git_dir = find_git_dir(repo_root)
+    if git_dir is None:
+        return None
+    return git_dir / "flowji-ai" / PID_FILENAME
+
+
+def read_running_pid(repo_root):
+    """Return the PID of a live detached watcher, or None."""
+    pid_path = _pid_path(repo_root)
+    try:
+        pid = int(pid_path.read_text(encoding="utf-8").strip())
+        os.kill(pid, 0)
+    except (AttributeError, OSError, ValueError):
+        return None
+    return pid
+
+
+def detach(repo_root, interval, force_poll):
+    """Start the watcher as a background process and record its PID."""
+    pid = read_running_pid(repo_root)
+    if pid:
+        print(f"[summary-watch] already running (pid {pid})")
+        return 0
+    pid_path = _pid_path(repo_root)
+    if pid_path is None:
+        print("[summary-watch] Error: could not locate the git directory", file=sys.stderr)
+        return 1
+    pid_path.parent.mkdir(parents=True, exist_ok=True)
+    args = [sys.executable, str(Path(__file__).resolve()), "--watch", "--interval", str(interval)]
+    if force_poll:
+        args.append("--poll")
+    with open(pid_path.with_name(LOG_FILENAME), "a", encoding="utf-8") as log:
+        process = subprocess.Popen(
+            args,
+            cwd=repo_root,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True
+        )
+    pid_path.write_text(f"{process.pid}\n", encoding="utf-8")
+    print(f"[summary-watch] started (pid {process.pid}, log: {pid_path.with_name(LOG_FILENAME)})")
+    return 0
+
+
+def stop(repo_root):
+    """Stop a detached watcher."""
+    pid = read_running_pid(repo_root)
+    if not pid:
+        print("[summary-watch] not running")
+        return 0
+    os.kill(pid, signal.SIGTERM)
+    _pid_path(repo_root).unlink(missing_ok=True)
+    print(f"[summary-watch] stopped (pid {pid})")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Keep summary indexes in step with hand edits and pulled summaries."
+    )
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--watch", action="store_true", help="Watch the summaries directory.")
+    group.add_argument("--status", action="store_true", help="Report whether a detached watcher is running.")
+    group.add_argument("--stop", action="store_true", help="Stop a detached watcher.")
+    group.add_argument(
+        "--hook",
+        nargs="+",
+        metavar=("NAME", "ARG"),
+        help="Re-index summaries changed by a post-merge or post-checkout (used by the hooks).",
+    )
+    parser.add_argument("--detach", action="store_true", help="With --watch, run in the background.")
+    parser.add_argument("--poll", action="store_true", help="With --watch, poll even where inotify is available.")
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help=f"Polling interval in seconds (default: {DEFAULT_POLL_INTERVAL:g}).",
+    )
+    args = parser.parse_args()
+
+    repo_root = require_repo_root("summary-watch")
+
+    if args.hook:
+        if args.hook[0] not in ("post-merge", "post-checkout"):
+            print(f"[summary-watch] Error: unsupported hook '{args.hook[0]}'", file=sys.stderr)
+            return 1
+        try:
+            return run_hook(repo_root, args.hook[0], args.hook[1:])
+        except OSError as e:
+            # Never fail a merge or checkout over a derived index
+            print(f"[summary-watch] Warning: could not update indexes: {e}", file=sys.stderr)
+            return 0
+    if args.status:
+        pid = read_running_pid(repo_root)
+        print(f"[summary-watch] running (pid {pid})" if pid else "[summary-watch] not running")
+        return 0
+    if args.stop:
+        return stop(repo_root)
+    if args.detach:
+        return detach(repo_root, max(args.interval, 0.1), args.poll)
+
+    try:
+        watch(repo_root, max(args.interval, 0.1), force_poll=args.poll)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())